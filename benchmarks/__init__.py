@@ -0,0 +1 @@
+"""Benchmarks of the Odido Klik&Klaar integration."""
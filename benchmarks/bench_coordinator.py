@@ -0,0 +1,95 @@
+"""Benchmarks of the coordinator and sensors, these need Home Assistant."""
+
+import asyncio
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+
+pytest.importorskip('homeassistant')
+
+from homeassistant import bootstrap, config_entries, loader  # noqa: E402
+from homeassistant.components import network  # noqa: E402
+from homeassistant.config_entries import SOURCE_USER, ConfigEntries, ConfigEntry  # noqa: E402
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.odido_klikklaar.const import EP_CELLINFO  # noqa: E402
+from custom_components.odido_klikklaar.coordinator import RouterCoordinator  # noqa: E402
+from custom_components.odido_klikklaar.sensor import (DESCRIPTIONS,  # noqa: E402
+                                                      lan_port_descriptions)
+from tools.mock_router import serve_in_process  # noqa: E402
+
+from .conftest import PAYLOAD_SIZES  # noqa: E402
+
+SENSOR_DESCRIPTIONS = [*DESCRIPTIONS, *lan_port_descriptions('LAN1')]
+
+
+@pytest.fixture
+def environment(tmp_path, request):
+    """A Home Assistant instance with a coordinator for a mock router in another process."""
+    loop = asyncio.new_event_loop()
+
+    async def _async_setup(port: int) -> tuple[HomeAssistant, RouterCoordinator]:
+        hass = HomeAssistant(str(tmp_path))
+        # The registries and helpers Home Assistant loads before any integration
+        loader.async_setup(hass)
+        hass.config_entries = ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+        # Loaded by the network dependency, the shared client session needs it
+        await network.async_get_adapters(hass)
+
+        entry = ConfigEntry(data={CONF_HOST: f'127.0.0.1:{port}',
+                                  CONF_USERNAME: 'admin',
+                                  CONF_PASSWORD: 'admin'},
+                            discovery_keys=MappingProxyType({}),
+                            domain='odido',
+                            minor_version=1,
+                            options={},
+                            source=SOURCE_USER,
+                            subentries_data=None,
+                            title='bench',
+                            unique_id='bench',
+                            version=1)
+        config_entries.current_entry.set(entry)
+
+        coordinator = RouterCoordinator(hass, entry)
+        coordinator.api.schema = 'http'
+        coordinator.data = await coordinator.async_update_data()
+
+        return hass, coordinator
+
+    with serve_in_process(latency=0,
+                          ports=PAYLOAD_SIZES[getattr(request, 'param', 'small')]) as port:
+        hass, coordinator = loop.run_until_complete(_async_setup(port))
+
+        yield SimpleNamespace(loop=loop, hass=hass, coordinator=coordinator)
+
+        loop.run_until_complete(hass.async_stop(force=True))
+        loop.close()
+
+
+def bench_coordinator_get_value(bench, environment):
+    """Walk a path into the coordinator data."""
+    coordinator = environment.coordinator
+
+    bench(lambda: coordinator.get_value(EP_CELLINFO, ['CellIntfInfo', 'RSSI']))
+
+
+@pytest.mark.parametrize('description', SENSOR_DESCRIPTIONS, ids=lambda d: d.key)
+def bench_sensor_value_fn(bench, data, description):
+    """Compute the state of a sensor."""
+    assert description.value_fn(data) is not None
+
+    bench(lambda: description.value_fn(data))
+
+
+@pytest.mark.parametrize('environment', list(PAYLOAD_SIZES), indirect=True)
+def bench_async_update_data(bench, environment):
+    """Run a full poll of the coordinator and keep its data."""
+    coordinator = environment.coordinator
+
+    def _update():
+        coordinator.data = environment.loop.run_until_complete(coordinator.async_update_data())
+        return coordinator.data
+
+    bench(_update)
@@ -0,0 +1,104 @@
+"""Benchmarks of the Home Assistant free data path."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from custom_components.odido_klikklaar.api import RouterAPI, RouterPollResult
+from custom_components.odido_klikklaar.const import EP_CELLINFO, KEY_INTERFACES
+from custom_components.odido_klikklaar.exporter import RouterExporter
+from custom_components.odido_klikklaar.extract import get_value
+from custom_components.odido_klikklaar.interfaces import (InterfaceResolver,
+                                                          build_interface_index)
+from custom_components.odido_klikklaar.schema import (EXTRACTORS,
+                                                      LAN_EXTRACTORS,
+                                                      POLL_ENDPOINTS,
+                                                      SENSORS,
+                                                      compile_schema)
+from tools.mock_router import serve_in_process
+
+from .conftest import PAYLOAD_SIZES
+
+
+def bench_get_value(bench, data):
+    """Walk a path into the poll data."""
+    bench(lambda: get_value(data, EP_CELLINFO, ['CellIntfInfo', 'RSSI']))
+
+
+@pytest.mark.parametrize('key', list(EXTRACTORS))
+def bench_extractor(bench, data, key):
+    """Extract the value of a sensor."""
+    extractor = EXTRACTORS[key]
+    assert extractor(data) is not None
+
+    bench(lambda: extractor(data))
+
+
+@pytest.mark.parametrize('key', list(LAN_EXTRACTORS))
+def bench_lan_extractor(bench, data, key):
+    """Extract the value of a LAN port sensor."""
+    extractor = LAN_EXTRACTORS[key]
+    assert extractor(data, 'LAN1') is not None
+
+    bench(lambda: extractor(data, 'LAN1'))
+
+
+def bench_compile_schema(bench):
+    """Validate and compile the sensor schema."""
+    bench(lambda: compile_schema(SENSORS))
+
+
+def bench_interface_index_build(bench, payloads):
+    """Build the interface lookup table from scratch."""
+    bench(lambda: build_interface_index(payloads))
+
+
+def bench_interface_index_resolve(bench, payloads):
+    """Resolve the interface lookup table when the interfaces did not change."""
+    resolver = InterfaceResolver()
+    resolver.resolve(payloads)
+
+    bench(lambda: resolver.resolve(payloads))
+
+
+def bench_snapshot(bench, payloads):
+    """Extract and render all metrics of a poll, as the exporter does."""
+    exporter = RouterExporter(routers=[])
+    resolver = InterfaceResolver()
+
+    def _snapshot():
+        result = RouterPollResult(data=dict(payloads), elapsed=0.1)
+        result.data[KEY_INTERFACES] = resolver.resolve(result.data)
+        exporter._update_snapshot('router', result, result.elapsed)
+        return exporter.render()
+
+    bench(_snapshot)
+
+
+@pytest.mark.parametrize('size', list(PAYLOAD_SIZES))
+def bench_poll_cycle(bench, size):
+    """Login, query and decode all endpoints of a mock router in another process."""
+    loop = asyncio.new_event_loop()
+
+    async def _async_setup(port: int) -> tuple[aiohttp.ClientSession, RouterAPI]:
+        session = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+        return session, RouterAPI(host=f'127.0.0.1:{port}',
+                                  user='admin',
+                                  pwd='admin',
+                                  session=session,
+                                  schema='http')
+
+    def _poll():
+        result = loop.run_until_complete(api.async_poll(POLL_ENDPOINTS, timeout=10))
+        assert not result.errors
+        return result
+
+    with serve_in_process(latency=0, ports=PAYLOAD_SIZES[size]) as port:
+        session, api = loop.run_until_complete(_async_setup(port))
+
+        try:
+            bench(_poll)
+        finally:
+            loop.run_until_complete(session.close())
+            loop.close()
@@ -0,0 +1,204 @@
+"""Benchmark fixtures for the coordinator data path.
+
+Every benchmark reports the time per operation and the peak and retained
+memory of a single operation, measured with tracemalloc. Results are
+compared with baseline.json and a benchmark fails when it is slower or
+uses more memory than the baseline allows.
+
+    pytest benchmarks                       # run and compare
+    pytest benchmarks --bench-update        # store the results as baseline
+"""
+
+from dataclasses import dataclass
+from datetime import date
+import gc
+import json
+from pathlib import Path
+import time
+import tracemalloc
+
+import pytest
+
+from custom_components.odido_klikklaar.const import KEY_INTERFACES, KEY_USAGE, USAGE_COUNTERS
+from custom_components.odido_klikklaar.extract import wan_counters
+from custom_components.odido_klikklaar.interfaces import InterfaceResolver
+from custom_components.odido_klikklaar.usage import UsageMeter
+from tools.mock_router import build_payloads
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+# Synthetic payload sizes, by the number of LAN ports, which also sets the
+# length of the IP interface lists
+PAYLOAD_SIZES = {
+    'small': 2,
+    'medium': 32,
+    'large': 256,
+}
+
+
+@dataclass
+class BenchResult:
+    """Class to hold the measurements of a benchmark."""
+
+    name: str
+    rounds: int
+    mean_us: float
+    min_us: float
+    peak_kib: float
+    retained_kib: float
+
+
+def pytest_addoption(parser):
+    """Add the benchmark options."""
+    parser.addoption('--bench-update', action='store_true',
+                     help='store the results in baseline.json')
+    parser.addoption('--bench-tolerance', type=float, default=0.5,
+                     help='allowed regression as a fraction of the baseline')
+    parser.addoption('--bench-time', type=float, default=0.2,
+                     help='seconds to spend timing each benchmark')
+
+
+def pytest_configure(config):
+    """Collect the results of all benchmarks."""
+    config.bench_results = []
+
+
+@pytest.fixture(params=list(PAYLOAD_SIZES))
+def payloads(request) -> dict[str, dict]:
+    """Synthetic poll data of a given size."""
+    return build_payloads(PAYLOAD_SIZES[request.param])
+
+
+@pytest.fixture
+def data(payloads) -> dict:
+    """Poll data with the interface index and usage meters, as the coordinator stores it."""
+    payloads[KEY_INTERFACES] = InterfaceResolver().resolve(payloads)
+    payloads[KEY_USAGE] = UsageMeter()
+
+    for _ in range(2):
+        payloads[KEY_USAGE].record({counter: wan_counters(payloads, traffic_counter)
+                                    for counter, traffic_counter in USAGE_COUNTERS.items()},
+                                   date.today())
+
+    return payloads
+
+
+def _measure_memory(func) -> tuple[float, float]:
+    """Return the peak and retained memory of a single call in KiB."""
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del result
+
+    return (peak - before) / 1024, (current - before) / 1024
+
+
+@pytest.fixture
+def bench(request):
+    """Time and profile an operation and check it against the baseline."""
+    config = request.config
+
+    def _bench(func, name: str | None = None) -> BenchResult:
+        name = name or request.node.name
+
+        # Warm up, then repeat the operation for the configured time
+        func()
+        timings = []
+        deadline = time.perf_counter() + config.getoption('--bench-time')
+
+        while len(timings) < 5 or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        peak_kib, retained_kib = _measure_memory(func)
+
+        result = BenchResult(name=name,
+                             rounds=len(timings),
+                             mean_us=sum(timings) / len(timings) * 1e6,
+                             min_us=min(timings) * 1e6,
+                             peak_kib=peak_kib,
+                             retained_kib=retained_kib)
+        config.bench_results.append(result)
+
+        _check_baseline(config, result)
+
+        return result
+
+    return _bench
+
+
+def _load_baseline() -> dict:
+    """Return the stored baseline."""
+    if not BASELINE.exists():
+        return {}
+
+    return json.loads(BASELINE.read_text(encoding='utf-8'))
+
+
+def _check_baseline(config, result: BenchResult) -> None:
+    """Fail when a result regressed beyond the tolerance."""
+    if config.getoption('--bench-update'):
+        return
+
+    baseline = _load_baseline().get(result.name)
+
+    if baseline is None:
+        return
+
+    limit = 1 + config.getoption('--bench-tolerance')
+    regressions = []
+
+    # Timings are compared by their minimum, which is the least noisy
+    if result.min_us > baseline['min_us'] * limit:
+        regressions.append(f"{result.min_us:.1f}us > {baseline['min_us']:.1f}us")
+
+    # Small allocations vary between runs, so ignore anything below 1 KiB
+    if result.peak_kib > max(baseline['peak_kib'] * limit, 1):
+        regressions.append(f"peak {result.peak_kib:.1f}KiB > {baseline['peak_kib']:.1f}KiB")
+
+    # Memory still held after a call, which grows when every call leaks
+    if 'retained_kib' in baseline and \
+            result.retained_kib > max(baseline['retained_kib'] * limit, 1):
+        regressions.append(f"retained {result.retained_kib:.1f}KiB > "
+                           f"{baseline['retained_kib']:.1f}KiB")
+
+    if regressions:
+        pytest.fail(f"{result.name} regressed: {', '.join(regressions)}")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report all results and update the baseline when asked."""
+    results = config.bench_results
+
+    if not results:
+        return
+
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(
+        f'{"benchmark":<60} {"rounds":>7} {"mean us":>10} {"min us":>10} '
+        f'{"peak KiB":>9} {"kept KiB":>9}')
+
+    for result in results:
+        terminalreporter.write_line(
+            f'{result.name:<60} {result.rounds:>7} {result.mean_us:>10.1f} '
+            f'{result.min_us:>10.1f} {result.peak_kib:>9.1f} {result.retained_kib:>9.1f}')
+
+    if config.getoption('--bench-update'):
+        baseline = _load_baseline()
+        baseline.update({
+            result.name: {'min_us': round(result.min_us, 2),
+                          'peak_kib': round(result.peak_kib, 2),
+                          'retained_kib': round(result.retained_kib, 2)}
+            for result in results
+        })
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n',
+                            encoding='utf-8')
+        terminalreporter.write_line(f'Baseline written to {BASELINE}')
@@ -5,18 +5,21 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 import logging
-
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceEntry
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from .coordinator import RouterCoordinator
+from typing import TYPE_CHECKING
+
+# Home Assistant is only imported when the integration is set up, so the
+# api, planner and extract modules can be used without it (see exporter.py)
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import Platform
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.device_registry import DeviceEntry
+    from homeassistant.helpers.typing import ConfigType
+    from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = ["sensor"]
                              #[#Platform.BINARY_SENSOR,
                              #Platform.SENSOR,
                              #Platform.BUTTON,
@@ -33,8 +36,18 @@ class RuntimeData:
     coordinator: DataUpdateCoordinator
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the query_oid service, shared by all routers."""
+    from .services import async_register_services
+
+    async_register_services(hass)
+
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: RouterConfigEntry) -> bool:
     """Set up Example Integration from a config entry."""
+    from .coordinator import RouterCoordinator
 
     # Initialise the coordinator that manages data updates from your api.
     # This is defined in coordinator.py
@@ -85,10 +98,26 @@ async def async_remove_config_entry_device(
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: RouterConfigEntry) -> None:
+    """Remove the stored data usage of a deleted router."""
+    from homeassistant.helpers.storage import Store
+
+    from .const import USAGE_STORAGE_KEY, USAGE_STORAGE_VERSION
+
+    await Store(hass,
+                USAGE_STORAGE_VERSION,
+                f'{USAGE_STORAGE_KEY}.{config_entry.entry_id}').async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: RouterConfigEntry) -> bool:
     """Unload a config entry."""
     # This is called when you remove your integration or shutdown HA.
-    # If you have created any custom services, they need to be removed here too.
+    # The services stay registered, they refuse routers that are not loaded.
 
     # Unload platforms and return result
-    return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
+    unloaded = await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
+
+    if unloaded:
+        await config_entry.runtime_data.coordinator.async_save_usage()
+
+    return unloaded
@@ -8,6 +8,7 @@ import logging
 import base64
 import aiohttp
 import asyncio
+from dataclasses import dataclass, field
 
 from .const import (API_SCHEMA,
                     API_LOGIN_PATH,
@@ -16,11 +17,23 @@ from .const import (API_SCHEMA,
                     LOGIN_PAYLOAD,
                     KEY_RESULT,
                     KEY_OBJECT,
-                    VAL_SUCCES)
+                    VAL_SUCCES,
+                    QUERY_ORDER_FIXED,
+                    QUERY_LATENCY_WEIGHT)
+from .planner import plan_queries
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class RouterPollResult:
+    """Class to hold the outcome of a single poll."""
+
+    data: dict[str, dict] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0
+
+
 class RouterAPI:
     """Class for example API."""
 
@@ -28,12 +41,17 @@ class RouterAPI:
                  host: str,
                  user: str,
                  pwd: str,
-                 session: aiohttp) -> None:
+                 session: aiohttp,
+                 schema: str = API_SCHEMA) -> None:
         """Initialise."""
         self.host = host
         self.user = user
         self.pwd = pwd
         self.session: aiohttp.ClientSession = session
+        self.schema = schema
+
+        # Smoothed response time per oid, used to plan the query order
+        self.latency: dict[str, float] = {}
     
     async def async_login(self) -> bool:
         """Login and obtain the session cookie"""
@@ -43,24 +61,30 @@ class RouterAPI:
         payload['Input_Passwd'] = base64.b64encode(
             self.pwd.encode('utf-8')).decode('utf-8')
 
-        try:
+        async with asyncio.timeout(API_TIMEOUT):
+            try:
 
-            response = await self.session.post(
-                f'{API_SCHEMA}://{self.host}{API_LOGIN_PATH}',
-                json=payload)
+                response = await self.session.post(
+                    f'{self.schema}://{self.host}{API_LOGIN_PATH}',
+                    json=payload)
         
-        except Exception as e:
-            _LOGGER.error(f'Could not connect to router. {e}')
-            raise RouterAPIConnectionError(
-                f'Error connecting to router. {e}')
+            except Exception as e:
+                _LOGGER.error(f'Could not connect to router. {e}')
+                raise RouterAPIConnectionError(
+                    f'Error connecting to router. {e}')
             
-        if response.status == 401:
-            raise RouterAPIAuthError('Username or password incorrect.')
+            if response.status == 401:
+                raise RouterAPIAuthError('Username or password incorrect.')
 
-        if response.ok:
-            try:
-                data = await response.json()
+            if response.ok:
+                try:
+                    data = await response.json()
+                except Exception as json_exception:
+                    raise RouterAPIInvalidResponse(f'Unable to decode login response') \
+                        from json_exception
 
+                # Checked outside the try so a rejected login is not
+                # reported as an undecodable response
                 if 'result' in data:
                     if data['result'] == VAL_SUCCES:
                         return True
@@ -68,12 +92,8 @@ class RouterAPI:
                         raise RouterAPIAuthError('Login failed')
                 else:
                     raise RouterAPIInvalidResponse('Key "result" not set in response')
-                    
-            except Exception as json_exception:
-                raise RouterAPIInvalidResponse(f'Unable to decode login response') \
-                    from json_exception
-        else:
-            raise RouterAPIInvalidResponse(f'Unknown status {response.status}')
+            else:
+                raise RouterAPIInvalidResponse(f'Unknown status {response.status}')
     
     async def async_query_api(self,
                               oid: str) -> dict:
@@ -81,7 +101,7 @@ class RouterAPI:
         async with asyncio.timeout(API_TIMEOUT):
             try:
                 response = await self.session.get(
-                    f'{API_SCHEMA}://{self.host}{API_BASE_PATH}',
+                    f'{self.schema}://{self.host}{API_BASE_PATH}',
                     params={'oid': oid})
             except Exception as exception:
                 raise RouterAPIConnectionError('Unable to connect to router API') \
@@ -106,6 +126,95 @@ class RouterAPI:
                 raise RouterAPIConnectionError(
                     f'Error retrieving API. Status: {response.status}')
 
+    async def async_poll(self,
+                         oids: list[str],
+                         timeout: float,
+                         concurrency: int | None = None,
+                         order: str = QUERY_ORDER_FIXED,
+                         login: bool = True) -> RouterPollResult:
+        """Login and query all oids within a single deadline.
+
+        At most `concurrency` queries are sent to the router at once, in
+        the given order. Queries still running when the deadline passes are
+        cancelled and only the results that completed in time are returned.
+        Pass login=False to reuse a session that was just authenticated.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + timeout
+
+        if login:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await self.async_login()
+            except TimeoutError as err:
+                raise RouterAPIConnectionError(
+                    f'Login did not complete within {timeout}s') from err
+
+        planned = plan_queries(oids, order, self.latency, estimate=timeout)
+        semaphore = asyncio.Semaphore(concurrency or max(1, len(planned)))
+
+        # Semaphore waiters are woken in FIFO order, so the plan is kept
+        tasks = {
+            oid: asyncio.create_task(self._async_timed_query(oid, semaphore, timeout))
+            for oid in planned
+        }
+
+        if tasks:
+            try:
+                await asyncio.wait(tasks.values(),
+                                   timeout=max(0, deadline - loop.time()))
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+
+                # Let cancelled queries release their connections
+                await asyncio.wait(tasks.values())
+
+        result = RouterPollResult()
+
+        for oid, task in tasks.items():
+            if task.cancelled():
+                result.errors[oid] = RouterAPIConnectionError(
+                    f'Query did not complete within {timeout}s')
+            elif task.exception() is not None:
+                result.errors[oid] = task.exception()
+            else:
+                result.data[oid] = task.result()
+
+        result.elapsed = loop.time() - start
+
+        return result
+
+    async def _async_timed_query(self,
+                                 oid: str,
+                                 semaphore: asyncio.Semaphore,
+                                 timeout: float) -> dict:
+        """Query an oid once a slot is free and record its response time
+
+        Failed queries are recorded too, and a query cancelled at the
+        deadline as taking at least the whole budget, so the planner does
+        not keep scheduling an oid that never completes in time.
+        """
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            cancelled = False
+
+            try:
+                return await self.async_query_api(oid=oid)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                latency = loop.time() - start
+
+                if cancelled:
+                    latency = max(latency, timeout)
+
+                previous = self.latency.get(oid, latency)
+                self.latency[oid] = previous + QUERY_LATENCY_WEIGHT * (latency - previous)
+
     @property
     def controller_name(self) -> str:
         """Return the name of the controller."""
@@ -0,0 +1,92 @@
+"""Query cache for the Odido Klik&Klaar 5G router.
+
+Serves ad-hoc DAL queries from a short-lived cache per oid and lets
+concurrent requests for the same oid share a single router request.
+Does not depend on Home Assistant.
+"""
+
+import asyncio
+import logging
+import time
+
+from .api import RouterAPI, RouterAPIAuthError
+from .const import QUERY_CACHE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class QueryCache:
+    """Cache DAL objects per oid in front of a RouterAPI."""
+
+    def __init__(self, api: RouterAPI, ttl: float = QUERY_CACHE_TTL) -> None:
+        """Initialise."""
+        self.api = api
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._pending: dict[str, asyncio.Future] = {}
+
+        # Set once the router rejected the credentials, so they are not
+        # sent again until the entry is reloaded with new ones
+        self.suspended = False
+
+    def update(self, data: dict[str, dict]) -> None:
+        """Store objects that were fetched elsewhere, like by a poll."""
+        now = time.monotonic()
+
+        for oid, value in data.items():
+            if isinstance(value, dict):
+                self._entries[oid] = (now, value)
+
+    async def async_query(self, oid: str, max_age: float | None = None) -> dict:
+        """Return the object of an oid, fetching it when the cached one is too old."""
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        entry = self._entries.get(oid)
+
+        if entry is not None and time.monotonic() - entry[0] <= max_age:
+            return entry[1]
+
+        future = self._pending.get(oid)
+
+        if future is None:
+            future = asyncio.ensure_future(self._async_fetch(oid))
+            # Retrieve the error even when every caller was cancelled
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._pending[oid] = future
+
+        # Shielded, so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(future)
+
+    async def _async_fetch(self, oid: str) -> dict:
+        """Query the router, logging in again when the session expired."""
+        try:
+            if self.suspended:
+                raise RouterAPIAuthError('The router rejected the credentials, '
+                                         'waiting for new ones')
+
+            try:
+                data = await self.api.async_query_api(oid=oid)
+            except RouterAPIAuthError:
+                _LOGGER.debug("Session expired, logging in again to query %s", oid)
+
+                try:
+                    await self.api.async_login()
+                except RouterAPIAuthError:
+                    self.suspended = True
+                    raise
+
+                data = await self.api.async_query_api(oid=oid)
+
+            self._prune()
+            self._entries[oid] = (time.monotonic(), data)
+
+            return data
+        finally:
+            self._pending.pop(oid, None)
+
+    def _prune(self) -> None:
+        """Drop expired objects."""
+        now = time.monotonic()
+
+        for oid in [oid for oid, (fetched, _) in self._entries.items()
+                    if now - fetched > self.ttl]:
+            del self._entries[oid]
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Mapping
 import logging
 from typing import Any
 
@@ -19,6 +21,7 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
     CONF_USERNAME,
 )
+from homeassistant.components import network
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -26,11 +29,30 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .api import (RouterAPI,
                   RouterAPIAuthError,
                   RouterAPIConnectionError)
+from .coordinator import get_router_session, store_handover
+from .discovery import async_discover_routers, scan_networks
 from .const import (DEFAULT_SCAN_INTERVAL,
                     DOMAIN,
                     MIN_SCAN_INTERVAL,
+                    CONF_ADAPTIVE_INTERVAL,
+                    CONF_MIN_INTERVAL,
+                    CONF_MAX_INTERVAL,
+                    DEFAULT_ADAPTIVE_INTERVAL,
+                    DEFAULT_MIN_INTERVAL,
+                    DEFAULT_MAX_INTERVAL,
+                    MIN_ADAPTIVE_INTERVAL,
+                    CONF_POLL_TIMEOUT,
+                    DEFAULT_POLL_TIMEOUT,
+                    MIN_POLL_TIMEOUT,
+                    CONF_MAX_CONCURRENCY,
+                    CONF_QUERY_ORDER,
+                    DEFAULT_MAX_CONCURRENCY,
+                    DEFAULT_QUERY_ORDER,
+                    MAX_CONCURRENCY,
+                    QUERY_ORDERS,
                     DEFAULT_IP,
-                    DEFAULT_USER)
+                    DEFAULT_USER,
+                    EP_DEVICESTATUS)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +65,27 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+MANUAL_HOST = "manual"
+
+
+async def discover_routers(hass: HomeAssistant) -> list[str]:
+    """Scan the local networks for routers."""
+    addresses = [
+        (ip_info["address"], ip_info["network_prefix"])
+        for adapter in await network.async_get_adapters(hass)
+        if adapter["enabled"]
+        for ip_info in adapter["ipv4"]
+    ]
+
+    session = async_get_clientsession(
+        hass=hass,
+        verify_ssl=False
+    )
+
+    return await async_discover_routers(session=session,
+                                        networks=scan_networks(addresses),
+                                        extra_hosts=[DEFAULT_IP])
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
@@ -57,23 +100,27 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     #     your_validate_func, data[CONF_USERNAME], data[CONF_PASSWORD]
     # )
 
-    session = async_get_clientsession(
-        hass=hass,
-        verify_ssl=False
-    )
-
     api = RouterAPI(host=data[CONF_HOST],
                     user=data[CONF_USERNAME],
                     pwd=data[CONF_PASSWORD],
-                    session=session)
+                    session=get_router_session(hass))
     try:
         await api.async_login()
     except RouterAPIAuthError as err:
         raise InvalidAuth from err
-    except RouterAPIConnectionError as err:
+    except (RouterAPIConnectionError, TimeoutError) as err:
         raise CannotConnect from err
-    
-    return {"title": data[CONF_HOST]}
+
+    # The session and device status are handed over to the coordinator
+    # once the flow creates or updates the entry, see store_handover
+    handover_data = {}
+
+    try:
+        handover_data[EP_DEVICESTATUS] = await api.async_query_api(oid=EP_DEVICESTATUS)
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.debug("Unable to fetch the device status during validation: %s", err)
+
+    return {"title": data[CONF_HOST], "api": api, "handover": handover_data}
 
 
 class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -81,6 +128,9 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
     _input_data: dict[str, Any]
+    _discovered_hosts: list[str] | None = None
+    _discovery_task: asyncio.Task | None = None
+    _host: str | None = None
 
     @staticmethod
     @callback
@@ -97,6 +147,10 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
         # Called when you initiate adding an integration via the UI
         errors: dict[str, str] = {}
 
+        if user_input is None and self._discovered_hosts is None:
+            # Offer the routers found on the local networks first
+            return await self.async_step_discover()
+
         if user_input is not None:
             # The form has been filled in and submitted, so process the data provided.
             try:
@@ -117,11 +171,70 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
                 # and create the config entry.
                 await self.async_set_unique_id(info.get("title"))
                 self._abort_if_unique_id_configured()
+                store_handover(self.hass, info["api"], info["handover"])
                 return self.async_create_entry(title=info["title"], data=user_input)
 
+        data_schema = STEP_USER_DATA_SCHEMA
+
+        if self._host is not None:
+            data_schema = self.add_suggested_values_to_schema(
+                STEP_USER_DATA_SCHEMA, {CONF_HOST: self._host, CONF_USERNAME: DEFAULT_USER}
+            )
+
         # Show initial form.
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="user", data_schema=data_schema, errors=errors
+        )
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Scan the local networks while showing the progress."""
+        if self._discovery_task is None:
+            self._discovery_task = self.hass.async_create_task(
+                discover_routers(self.hass)
+            )
+
+        if not self._discovery_task.done():
+            return self.async_show_progress(
+                step_id="discover",
+                progress_action="discover",
+                progress_task=self._discovery_task,
+            )
+
+        try:
+            hosts = self._discovery_task.result()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unable to discover routers")
+            hosts = []
+
+        configured = self._async_current_ids()
+        self._discovered_hosts = [host for host in hosts if host not in configured]
+
+        return self.async_show_progress_done(
+            next_step_id="pick_router" if self._discovered_hosts else "user"
+        )
+
+    async def async_step_pick_router(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Let the user pick one of the discovered routers."""
+        if user_input is not None:
+            if user_input[CONF_HOST] != MANUAL_HOST:
+                self._host = user_input[CONF_HOST]
+
+            return await self.async_step_user()
+
+        hosts = {host: host for host in self._discovered_hosts}
+        hosts[MANUAL_HOST] = "Enter the address manually"
+
+        return self.async_show_form(
+            step_id="pick_router",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST, default=self._discovered_hosts[0]): vol.In(hosts),
+                }
+            ),
         )
 
     async def async_step_reconfigure(
@@ -140,7 +253,7 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 user_input[CONF_HOST] = config_entry.data[CONF_HOST]
-                await validate_input(self.hass, user_input)
+                info = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -149,6 +262,7 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
+                store_handover(self.hass, info["api"], info["handover"])
                 return self.async_update_reload_and_abort(
                     config_entry,
                     unique_id=config_entry.unique_id,
@@ -169,6 +283,53 @@ class RouterConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """Handle credentials rejected by the router."""
+        # Started by the coordinator raising ConfigEntryAuthFailed. Polling
+        # stays suspended until the new credentials have been validated.
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for new credentials and validate them against the router."""
+        errors: dict[str, str] = {}
+        config_entry = self._get_reauth_entry()
+
+        if user_input is not None:
+            try:
+                info = await validate_input(self.hass, {**config_entry.data, **user_input})
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                store_handover(self.hass, info["api"], info["handover"])
+                return self.async_update_reload_and_abort(
+                    config_entry,
+                    data_updates=user_input,
+                )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_USERNAME, default=config_entry.data[CONF_USERNAME]
+                    ): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            description_placeholders={"host": config_entry.data[CONF_HOST]},
+            errors=errors,
+        )
+
+
 class RouterOptionsFlowHandler(OptionsFlow):
     """Handles the options flow."""
 
@@ -179,9 +340,16 @@ class RouterOptionsFlowHandler(OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Handle options flow."""
+        errors: dict[str, str] = {}
+
         if user_input is not None:
-            options = self.config_entry.options | user_input
-            return self.async_create_entry(title="", data=options)
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                options = self.config_entry.options | user_input
+                return self.async_create_entry(title="", data=options)
+
+            self.options.update(user_input)
 
         # It is recommended to prepopulate options fields with default values if available.
         # These will be the same default values you use on your coordinator for setting variable values
@@ -192,10 +360,36 @@ class RouterOptionsFlowHandler(OptionsFlow):
                     CONF_SCAN_INTERVAL,
                     default=self.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
                 ): (vol.All(vol.Coerce(int), vol.Clamp(min=MIN_SCAN_INTERVAL))),
+                vol.Required(
+                    CONF_POLL_TIMEOUT,
+                    default=self.options.get(CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT),
+                ): (vol.All(vol.Coerce(int), vol.Clamp(min=MIN_POLL_TIMEOUT))),
+                vol.Required(
+                    CONF_MAX_CONCURRENCY,
+                    default=self.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                ): (vol.All(vol.Coerce(int), vol.Clamp(min=1, max=MAX_CONCURRENCY))),
+                vol.Required(
+                    CONF_QUERY_ORDER,
+                    default=self.options.get(CONF_QUERY_ORDER, DEFAULT_QUERY_ORDER),
+                ): vol.In(QUERY_ORDERS),
+                vol.Required(
+                    CONF_ADAPTIVE_INTERVAL,
+                    default=self.options.get(CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL),
+                ): bool,
+                vol.Required(
+                    CONF_MIN_INTERVAL,
+                    default=self.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                ): (vol.All(vol.Coerce(int), vol.Clamp(min=MIN_ADAPTIVE_INTERVAL))),
+                vol.Required(
+                    CONF_MAX_INTERVAL,
+                    default=self.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+                ): (vol.All(vol.Coerce(int), vol.Clamp(min=MIN_ADAPTIVE_INTERVAL))),
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=data_schema)
+        return self.async_show_form(
+            step_id="init", data_schema=data_schema, errors=errors
+        )
 
 
 class CannotConnect(HomeAssistantError):
@@ -16,10 +16,20 @@ EP_DEVICESTATUS: Final[str] = 'cardpage_status'
 EP_TRAFFIC: Final[str] = 'Traffic_Status'
 EP_COMMON: Final[str] = 'cardpage_status'
 
+# Discovery
+DISCOVERY_PORT: Final = 443
+DISCOVERY_CONCURRENCY: Final = 64
+DISCOVERY_CONNECT_TIMEOUT: Final = 0.5
+DISCOVERY_PROBE_TIMEOUT: Final = 2
+DISCOVERY_CACHE_TTL: Final = 300
+DISCOVERY_MAX_PREFIX: Final = 22
+
 # Keys & values
 KEY_RESULT: Final[str] = 'result'
 KEY_OBJECT: Final[str] = 'Object'
 VAL_SUCCES: Final[str] = 'ZCFG_SUCCESS'
+KEY_INTERFACES: Final[str] = '_interfaces'
+KEY_USAGE: Final[str] = '_usage'
 
 # Base component constants.
 DOMAIN: Final = "odido"
@@ -34,6 +44,78 @@ DEFAULT_NAME: Final[str] = NAME
 DEFAULT_SCAN_INTERVAL: Final = 60
 MIN_SCAN_INTERVAL = 30
 
+# Session handover from the config flow to the coordinator
+DATA_HANDOVER: Final[str] = 'odido_handover'
+HANDOVER_TTL: Final = 60
+
+# Data usage meters
+USAGE_STORAGE_KEY: Final[str] = 'odido_usage'
+USAGE_STORAGE_VERSION: Final = 1
+USAGE_SAVE_DELAY: Final = 300
+# Usage meter counter and the WAN traffic counter it accumulates
+USAGE_COUNTERS: Final[dict[str, str]] = {'downloaded': 'BytesReceived',
+                                         'uploaded': 'BytesSent'}
+# Counters of the interface statistics in Traffic_Status
+TRAFFIC_COUNTERS: Final = ('BytesSent',
+                           'BytesReceived',
+                           'PacketsSent',
+                           'PacketsReceived',
+                           'ErrorsSent',
+                           'ErrorsReceived',
+                           'DiscardPacketsSent',
+                           'DiscardPacketsReceived')
+
+# Device registry
+EVENT_FIRMWARE_UPDATED: Final[str] = 'odido_firmware_updated'
+DEVICE_FINGERPRINT_KEYS: Final = ('ModelName',
+                                  'ProductClass',
+                                  'SoftwareVersion',
+                                  'HardwareVersion',
+                                  'SerialNumber')
+
+# Services
+SERVICE_QUERY_OID: Final[str] = 'query_oid'
+ATTR_CONFIG_ENTRY_ID: Final[str] = 'config_entry_id'
+ATTR_OID: Final[str] = 'oid'
+ATTR_MAX_AGE: Final[str] = 'max_age'
+QUERY_CACHE_TTL: Final = 30
+
+# Poll budget
+CONF_POLL_TIMEOUT: Final[str] = 'poll_timeout'
+DEFAULT_POLL_TIMEOUT: Final = 30
+MIN_POLL_TIMEOUT: Final = 5
+
+# Query scheduling
+CONF_MAX_CONCURRENCY: Final[str] = 'max_concurrency'
+CONF_QUERY_ORDER: Final[str] = 'query_order'
+QUERY_ORDER_FIXED: Final[str] = 'fixed'
+QUERY_ORDER_FASTEST_FIRST: Final[str] = 'fastest_first'
+QUERY_ORDER_SLOWEST_FIRST: Final[str] = 'slowest_first'
+QUERY_ORDERS: Final = [QUERY_ORDER_FIXED,
+                       QUERY_ORDER_FASTEST_FIRST,
+                       QUERY_ORDER_SLOWEST_FIRST]
+DEFAULT_MAX_CONCURRENCY: Final = 1
+DEFAULT_QUERY_ORDER: Final[str] = QUERY_ORDER_FASTEST_FIRST
+MAX_CONCURRENCY: Final = 8
+QUERY_LATENCY_WEIGHT: Final = 0.3
+
+# Adaptive scan interval
+CONF_ADAPTIVE_INTERVAL: Final[str] = 'adaptive_interval'
+CONF_MIN_INTERVAL: Final[str] = 'min_interval'
+CONF_MAX_INTERVAL: Final[str] = 'max_interval'
+DEFAULT_ADAPTIVE_INTERVAL: Final = False
+DEFAULT_MIN_INTERVAL: Final = 15
+DEFAULT_MAX_INTERVAL: Final = 300
+MIN_ADAPTIVE_INTERVAL: Final = 15
+ADAPTIVE_FAST_LATENCY: Final = 2.0
+ADAPTIVE_SLOW_LATENCY: Final = 5.0
+ADAPTIVE_FAST_POLLS: Final = 3
+ADAPTIVE_SPEEDUP_FACTOR: Final = 0.8
+ADAPTIVE_SLOWDOWN_FACTOR: Final = 1.25
+ADAPTIVE_BACKOFF_FACTOR: Final = 2.0
+ADAPTIVE_LATENCY_WEIGHT: Final = 0.3
+ADAPTIVE_FAILURE_RATIO: Final = 0.5
+
 # Payloads
 LOGIN_PAYLOAD: dict = {
     'Input_Account': None,
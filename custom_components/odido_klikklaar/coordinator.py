@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 from datetime import timedelta
 import logging
-import asyncio
+import time
 import traceback as tb
 
 from homeassistant.config_entries import ConfigEntry
@@ -13,20 +13,49 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
     CONF_USERNAME,
 )
-from homeassistant.core import DOMAIN, HomeAssistant
+from homeassistant.core import DOMAIN as HA_DOMAIN, HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+import aiohttp
 
 from .api import RouterAPI, RouterAPIAuthError
-from .const import (DEFAULT_SCAN_INTERVAL,
-                    EP_CELLINFO,
+from .cache import QueryCache
+from .interval import AdaptiveInterval
+from .interfaces import InterfaceResolver
+from .usage import UsageMeter
+from .extract import get_value, wan_counters
+from .schema import POLL_ENDPOINTS
+from .const import (DOMAIN,
+                    DEFAULT_SCAN_INTERVAL,
+                    CONF_ADAPTIVE_INTERVAL,
+                    CONF_MIN_INTERVAL,
+                    CONF_MAX_INTERVAL,
+                    DEFAULT_ADAPTIVE_INTERVAL,
+                    DEFAULT_MIN_INTERVAL,
+                    DEFAULT_MAX_INTERVAL,
+                    CONF_POLL_TIMEOUT,
+                    DEFAULT_POLL_TIMEOUT,
                     EP_DEVICESTATUS,
-                    EP_LANINFO,
-                    EP_TRAFFIC,
-                    EP_COMMON,
-                    API_SCHEMA)
+                    CONF_MAX_CONCURRENCY,
+                    CONF_QUERY_ORDER,
+                    DEFAULT_MAX_CONCURRENCY,
+                    DEFAULT_QUERY_ORDER,
+                    DATA_HANDOVER,
+                    HANDOVER_TTL,
+                    KEY_INTERFACES,
+                    KEY_USAGE,
+                    USAGE_STORAGE_KEY,
+                    USAGE_STORAGE_VERSION,
+                    USAGE_SAVE_DELAY,
+                    USAGE_COUNTERS,
+                    EVENT_FIRMWARE_UPDATED,
+                    DEVICE_FINGERPRINT_KEYS)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +67,52 @@ class RouterAPIData:
     data: dict
 
 
+@dataclass
+class RouterHandover:
+    """Class to hold a session validated by the config flow."""
+
+    api: RouterAPI
+    data: dict[str, dict]
+    created: float
+
+
+def get_router_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the shared session used to talk to routers."""
+    session = async_get_clientsession(
+        hass=hass,
+        verify_ssl=False
+    )
+
+    # The router is addressed by IP, accept its session cookie anyway
+    session.cookie_jar._unsafe = True
+
+    return session
+
+
+def store_handover(hass: HomeAssistant, api: RouterAPI, data: dict[str, dict]) -> None:
+    """Keep a freshly validated session for the coordinator of the router."""
+    handovers: dict[str, RouterHandover] = hass.data.setdefault(DATA_HANDOVER, {})
+    now = time.monotonic()
+
+    for host in [host for host, handover in handovers.items()
+                 if now - handover.created > HANDOVER_TTL]:
+        del handovers[host]
+
+    handovers[api.host] = RouterHandover(api=api, data=data, created=now)
+
+
+def pop_handover(hass: HomeAssistant, host: str, user: str, pwd: str) -> RouterHandover | None:
+    """Take the validated session of a router if it is recent and still matches."""
+    handover = hass.data.get(DATA_HANDOVER, {}).pop(host, None)
+
+    if handover is None \
+            or time.monotonic() - handover.created > HANDOVER_TTL \
+            or (handover.api.user, handover.api.pwd) != (user, pwd):
+        return None
+
+    return handover
+
+
 class RouterCoordinator(DataUpdateCoordinator):
     """My example coordinator."""
 
@@ -53,13 +128,47 @@ class RouterCoordinator(DataUpdateCoordinator):
         self.pwd = config_entry.data[CONF_PASSWORD]
 
         self.device_info = None
+        self._device_fingerprint: tuple | None = None
         self.config_entry = config_entry
 
+        # Positions of the WAN/LAN interfaces, resolved by name
+        self.interfaces = InterfaceResolver()
+
+        # Data usage of the current day and month, restored in _async_setup
+        self.usage = UsageMeter()
+        self._usage_store = Store(hass,
+                                  USAGE_STORAGE_VERSION,
+                                  f'{USAGE_STORAGE_KEY}.{config_entry.entry_id}')
+        self._usage_save_pending = False
+
         # set variables from options.  You need a default here incase options have not been set
         self.poll_interval = config_entry.options.get(
             CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
         )
 
+        # Budget for a single poll including the login
+        self.poll_timeout = config_entry.options.get(
+            CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT
+        )
+
+        # Number of simultaneous requests the router gets and their order
+        self.max_concurrency = config_entry.options.get(
+            CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+        )
+        self.query_order = config_entry.options.get(
+            CONF_QUERY_ORDER, DEFAULT_QUERY_ORDER
+        )
+
+        # Let the poll interval follow the router's latency and error rate
+        self.adaptive_interval = None
+
+        if config_entry.options.get(CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL):
+            self.adaptive_interval = AdaptiveInterval(
+                interval=self.poll_interval,
+                minimum=config_entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                maximum=config_entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL))
+            self.poll_interval = self.adaptive_interval.interval
+
         # Initialise DataUpdateCoordinator
         super().__init__(
             hass,
@@ -72,18 +181,34 @@ class RouterCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=self.poll_interval),
         )
 
-        session = async_get_clientsession(
-            hass=hass,
-            verify_ssl=False
-        )
+        # Reuse the session the config flow just validated, so the first
+        # refresh needs neither a login nor the device status request
+        self._handover = pop_handover(hass, self.host, self.user, self.pwd)
 
-        session.cookie_jar._unsafe = True
+        if self._handover is not None:
+            self.api = self._handover.api
+        else:
+            # Initialise your api here
+            self.api = RouterAPI(host=self.host,
+                                 user=self.user,
+                                 pwd=self.pwd,
+                                 session=get_router_session(hass))
 
-        # Initialise your api here
-        self.api = RouterAPI(host=self.host,
-                             user=self.user,
-                             pwd=self.pwd,
-                             session=session)
+        # Serves the query_oid service, sharing the session of the polls
+        self.query_cache = QueryCache(self.api)
+
+    async def _async_setup(self) -> None:
+        """Restore the data usage meters and migrate the device before the first refresh."""
+        if (state := await self._usage_store.async_load()) is not None:
+            self.usage = UsageMeter(state)
+
+        # The device used to be registered under the domain of Home Assistant itself
+        registry = dr.async_get(self.hass)
+        device = registry.async_get_device(identifiers={(HA_DOMAIN, self.config_entry.entry_id)})
+
+        if device is not None and self.config_entry.entry_id in device.config_entries:
+            registry.async_update_device(
+                device.id, new_identifiers={(DOMAIN, self.config_entry.entry_id)})
 
     async def async_update_data(self):
         """Fetch data from API endpoint.
@@ -91,74 +216,178 @@ class RouterCoordinator(DataUpdateCoordinator):
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
+        start = time.monotonic()
+        handover, self._handover = self._handover, None
+
         try:
-            # First login to refresh session
-            if await self.api.async_login():
-                # Get API endpoints
-                endpoints = [EP_CELLINFO,
-                             EP_DEVICESTATUS,
-                             EP_LANINFO,
-                             EP_TRAFFIC,
-                             EP_COMMON]
-                
-                results = await asyncio.gather(
-                    *[self.api.async_query_api(oid=endpoint) for endpoint in endpoints],
-                    return_exceptions=True)
-                
-                data = {
-                    endpoints[i]: results[i]
-                    for i in range(len(endpoints))
-                }
-
-                info = data[EP_DEVICESTATUS]['DeviceInfo']
-
-                self.device_info = DeviceInfo(
-                    configuration_url=f'{API_SCHEMA}://{self.api.host}',
-                    identifiers={(DOMAIN, self.config_entry.entry_id)},
-                    model=info['ModelName'],
-                    manufacturer=info['Manufacturer'],
-                    name=info['Description'],
-                    sw_version=info['SoftwareVersion'],
-                    hw_version=info['HardwareVersion'],
-                    model_id=info['ProductClass'],
-                    serial_number=['SerialNumber'],
-                )
-
-                return data
+            result = None
+
+            if handover is not None:
+                # Only query what the config flow did not fetch already
+                result = await self.api.async_poll(
+                    oids=[oid for oid in POLL_ENDPOINTS if oid not in handover.data],
+                    timeout=self.poll_timeout,
+                    concurrency=self.max_concurrency,
+                    order=self.query_order,
+                    login=False)
+                result.data = handover.data | result.data
+
+                # The handed over session expired after all, poll normally
+                if any(isinstance(err, RouterAPIAuthError) for err in result.errors.values()):
+                    result = None
+
+            if result is None:
+                # Login to refresh session and query all endpoints within the poll budget
+                result = await self.api.async_poll(oids=POLL_ENDPOINTS,
+                                                   timeout=self.poll_timeout,
+                                                   concurrency=self.max_concurrency,
+                                                   order=self.query_order)
 
         except RouterAPIAuthError as err:
+            # Stops polling and starts the reauth flow, so rejected
+            # credentials are not retried until the user provides new ones
             _LOGGER.error(err)
-            raise UpdateFailed(err) from err
+            raise self._auth_failed(err) from err
         except Exception as err:
+            self._adapt_interval(time.monotonic() - start, failure_ratio=1.0)
             # This will show entities as unavailable by raising UpdateFailed exception
             _LOGGER.error(''.join(tb.format_exception(None, err, err.__traceback__)))
             _LOGGER.error(err)
             raise UpdateFailed(f"Error communicating with API: {err}") from err
 
-        # # What is returned here is stored in self.data by the DataUpdateCoordinator
-        # return RouterAPIData(self.api.controller_name, devices)
+        self._adapt_interval(result.elapsed,
+                             failure_ratio=len(result.errors) / max(1, len(result.errors) + len(result.data)))
+
+        for endpoint, err in result.errors.items():
+            _LOGGER.warning("Unable to query %s: %s", endpoint, err)
+
+        _LOGGER.debug("Poll took %.2fs, response time per endpoint: %s",
+                      result.elapsed, self.api.latency)
+
+        if not result.data:
+            for err in result.errors.values():
+                if isinstance(err, RouterAPIAuthError):
+                    raise self._auth_failed(err) from err
+
+            raise UpdateFailed("No endpoint returned data within the poll budget")
+
+        data = result.data
+
+        try:
+            self.query_cache.update(data)
+            data[KEY_INTERFACES] = self.interfaces.resolve(data)
+            self._update_usage(data)
+
+            if EP_DEVICESTATUS in data:
+                self._sync_device(data[EP_DEVICESTATUS]['DeviceInfo'])
+        except (IndexError, KeyError, TypeError) as err:
+            # A response without the expected structure, like a device status
+            # without DeviceInfo, shows the entities as unavailable
+            _LOGGER.error("Unexpected response from the router: %r", err)
+            raise UpdateFailed(f"Unexpected response from the router: {err!r}") from err
+
+        # What is returned here is stored in self.data by the DataUpdateCoordinator
+        return data
+
+    def _auth_failed(self, err: RouterAPIAuthError) -> ConfigEntryAuthFailed:
+        """Stop the query_oid service from sending the rejected credentials too."""
+        self.query_cache.suspended = True
+
+        return ConfigEntryAuthFailed(err)
+
+    def _sync_device(self, info: dict) -> None:
+        """Update the device, but only when the model, firmware or serial changed.
+
+        Fields the firmware does not report are left empty, for the
+        fingerprint and the device alike.
+        """
+        fingerprint = tuple(info.get(key) for key in DEVICE_FINGERPRINT_KEYS)
+
+        if fingerprint == self._device_fingerprint:
+            return
+
+        self._device_fingerprint = fingerprint
+
+        self.device_info = DeviceInfo(
+            configuration_url=f'{self.api.schema}://{self.api.host}',
+            identifiers={(DOMAIN, self.config_entry.entry_id)},
+            model=info.get('ModelName'),
+            manufacturer=info.get('Manufacturer'),
+            name=info.get('Description'),
+            sw_version=info.get('SoftwareVersion'),
+            hw_version=info.get('HardwareVersion'),
+            model_id=info.get('ProductClass'),
+            serial_number=info.get('SerialNumber'),
+        )
+
+        registry = dr.async_get(self.hass)
+        device = registry.async_get_device(identifiers={(DOMAIN, self.config_entry.entry_id)})
+
+        # Not registered yet, the sensors register it with the device info
+        if device is None:
+            return
+
+        version = info.get('SoftwareVersion')
+
+        if None not in (device.sw_version, version) and device.sw_version != version:
+            _LOGGER.info("Firmware of %s was updated from %s to %s",
+                         self.host, device.sw_version, version)
+            self.hass.bus.async_fire(EVENT_FIRMWARE_UPDATED, {
+                'device_id': device.id,
+                'config_entry_id': self.config_entry.entry_id,
+                'previous_version': device.sw_version,
+                'version': version,
+            })
+
+        registry.async_update_device(device.id,
+                                     model=info.get('ModelName'),
+                                     model_id=info.get('ProductClass'),
+                                     sw_version=version,
+                                     hw_version=info.get('HardwareVersion'),
+                                     serial_number=info.get('SerialNumber'))
+
+    def _update_usage(self, data: dict) -> None:
+        """Add the WAN traffic since the last poll to the data usage meters."""
+        data[KEY_USAGE] = self.usage
+
+        changed = self.usage.record({counter: wan_counters(data, traffic_counter)
+                                     for counter, traffic_counter in USAGE_COUNTERS.items()},
+                                    dt_util.now().date())
+
+        # Saving again before the pending save was written would postpone
+        # it on every poll, so only schedule one when none is pending
+        if changed and not self._usage_save_pending:
+            self._usage_save_pending = True
+            self._usage_store.async_delay_save(self._usage_state, USAGE_SAVE_DELAY)
+
+    async def async_save_usage(self) -> None:
+        """Write a pending save of the data usage meters now.
+
+        Called on unload, so the delayed save cannot write the file again
+        after the entry was removed.
+        """
+        if self._usage_save_pending:
+            await self._usage_store.async_save(self._usage_state())
+
+    def _usage_state(self) -> dict:
+        """Return the state of the data usage meters when it is written."""
+        self._usage_save_pending = False
+        return self.usage.as_dict()
+
+    def _adapt_interval(self, latency: float, failure_ratio: float) -> None:
+        """Feed the poll outcome to the adaptive interval."""
+        if self.adaptive_interval is None:
+            return
+
+        interval = self.adaptive_interval.record(latency, failure_ratio)
+
+        if interval != self.poll_interval:
+            self.poll_interval = interval
+            self.update_interval = timedelta(seconds=interval)
 
     def get_value(self, endpoint: str, path: list[int | str], default=None) -> StateType:
         """
         Get a value from the data by a given path.
         When the value is absent, the default (None) will be returned and an error will be logged.
         """
-        value = self.data.get(endpoint, default)
-
-        try:
-            for key in path:
-                value = value[key]
-
-            value_type = type(value).__name__
-
-            if value_type in ["int", "float", "str"]:
-                _LOGGER.debug(
-                    "Path %s returns a %s (value = %s)", path, value_type, value
-                )
-            else:
-                _LOGGER.debug("Path %s returns a %s", path, value_type)
-
-            return value
-        except (IndexError, KeyError):
-            _LOGGER.warning("Can't find a value for %s in the API response", path)
-            return default
+        return get_value(self.data, endpoint, path, default)
@@ -0,0 +1,144 @@
+"""LAN discovery of Odido Klik&Klaar 5G routers.
+
+Scans networks for hosts with an open web port and fingerprints those by
+their DAL or login endpoint. Does not depend on Home Assistant.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import time
+
+import aiohttp
+
+from .const import (API_SCHEMA,
+                    API_BASE_PATH,
+                    API_LOGIN_PATH,
+                    EP_CELLINFO,
+                    KEY_RESULT,
+                    DISCOVERY_PORT,
+                    DISCOVERY_CONCURRENCY,
+                    DISCOVERY_CONNECT_TIMEOUT,
+                    DISCOVERY_PROBE_TIMEOUT,
+                    DISCOVERY_CACHE_TTL,
+                    DISCOVERY_MAX_PREFIX)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Discovered hosts per scanned set of networks, with the time of the scan
+_CACHE: dict[tuple, tuple[float, list[str]]] = {}
+
+
+def scan_networks(addresses: list[tuple[str, int]]) -> list[ipaddress.IPv4Network]:
+    """Return the networks to scan for the given interface addresses.
+
+    Networks larger than DISCOVERY_MAX_PREFIX are narrowed down to the /24
+    around the address, so a scan always completes in a few seconds.
+    """
+    networks: dict[ipaddress.IPv4Network, None] = {}
+
+    for address, prefix in addresses:
+        network = ipaddress.ip_interface(f'{address}/{max(prefix, 0)}').network
+
+        if network.version != 4 or network.is_loopback or network.is_link_local:
+            continue
+
+        if network.prefixlen < DISCOVERY_MAX_PREFIX:
+            network = ipaddress.ip_interface(f'{address}/24').network
+
+        networks[network] = None
+
+    return list(networks)
+
+
+async def _async_port_open(host: str, port: int) -> bool:
+    """Check whether a TCP connection to the host can be made."""
+    try:
+        async with asyncio.timeout(DISCOVERY_CONNECT_TIMEOUT):
+            _, writer = await asyncio.open_connection(host, port)
+    except (OSError, TimeoutError):
+        return False
+
+    writer.close()
+
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+    return True
+
+
+async def _async_fingerprint(session: aiohttp.ClientSession,
+                             base_url: str) -> bool:
+    """Check whether the web server at base_url is a Zyxel router."""
+    try:
+        async with asyncio.timeout(DISCOVERY_PROBE_TIMEOUT):
+            # An unauthenticated DAL query is refused with a ZCFG result,
+            # a bare 401 is no proof, any web server can send one
+            async with session.get(f'{base_url}{API_BASE_PATH}',
+                                   params={'oid': EP_CELLINFO},
+                                   allow_redirects=False) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError:
+                    data = None
+
+                if isinstance(data, dict) and str(data.get(KEY_RESULT, '')).startswith('ZCFG'):
+                    return True
+
+            async with session.get(f'{base_url}{API_LOGIN_PATH}',
+                                   allow_redirects=False) as response:
+                body = await response.text(errors='ignore')
+
+                return 'zyxel' in body.lower() \
+                    or 'zyxel' in response.headers.get('Server', '').lower()
+
+    except (aiohttp.ClientError, TimeoutError) as err:
+        _LOGGER.debug("Probing %s failed: %s", base_url, err)
+        return False
+
+
+async def async_discover_routers(session: aiohttp.ClientSession,
+                                 networks: list[ipaddress.IPv4Network],
+                                 extra_hosts: list[str] | None = None,
+                                 port: int = DISCOVERY_PORT,
+                                 schema: str = API_SCHEMA,
+                                 concurrency: int = DISCOVERY_CONCURRENCY) -> list[str]:
+    """Scan the networks concurrently and return the hosts of found routers.
+
+    Results are cached for DISCOVERY_CACHE_TTL seconds per set of networks.
+    """
+    key = (tuple(networks), tuple(extra_hosts or ()), port, schema)
+    cached = _CACHE.get(key)
+
+    if cached is not None and time.monotonic() - cached[0] < DISCOVERY_CACHE_TTL:
+        return cached[1]
+
+    candidates = list(dict.fromkeys(
+        [*(extra_hosts or []),
+         *(str(address) for network in networks for address in network.hosts())]))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _async_probe(address: str) -> str | None:
+        async with semaphore:
+            if not await _async_port_open(address, port):
+                return None
+
+            host = address if port == DISCOVERY_PORT else f'{address}:{port}'
+
+            if await _async_fingerprint(session, f'{schema}://{host}'):
+                return host
+
+            return None
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(_async_probe(address) for address in candidates))
+    hosts = [host for host in results if host is not None]
+
+    _LOGGER.debug("Scanned %s hosts in %.1fs, found routers: %s",
+                  len(candidates), time.monotonic() - start, hosts)
+
+    _CACHE[key] = (time.monotonic(), hosts)
+
+    return hosts
@@ -0,0 +1,321 @@
+"""Prometheus exporter for Odido Klik&Klaar 5G routers.
+
+Polls any number of routers without Home Assistant and serves the latest
+readings in the Prometheus text format. Routers are polled on their own
+schedule; a scrape only renders the cached snapshots and never triggers a
+request to a router.
+
+Run with:
+
+    python -m custom_components.odido_klikklaar.exporter routers.json
+
+where routers.json looks like:
+
+    {
+        "port": 9877,
+        "scan_interval": 60,
+        "routers": [
+            {"host": "192.168.1.1", "username": "admin", "password": "secret"}
+        ]
+    }
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import json
+import logging
+import time
+
+import aiohttp
+from aiohttp import web
+
+from .api import RouterAPI, RouterPollResult
+from .const import (API_SCHEMA,
+                    DEFAULT_USER,
+                    DEFAULT_SCAN_INTERVAL,
+                    DEFAULT_POLL_TIMEOUT,
+                    DEFAULT_MAX_CONCURRENCY,
+                    DEFAULT_QUERY_ORDER,
+                    KEY_INTERFACES)
+from .schema import EXTRACTORS, LAN_EXTRACTORS, POLL_ENDPOINTS
+from .interfaces import InterfaceResolver
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9877
+METRIC_PREFIX = 'odido'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Metric type and help text per extractor. String values are exported as
+# an info metric with the value as label.
+METRICS: dict[str, tuple[str, str]] = {
+    'rssi': ('gauge', 'Received signal strength indicator in dBm'),
+    'rsrq': ('gauge', 'Reference signal received quality in dB'),
+    'rsrp': ('gauge', 'Reference signal received power in dBm'),
+    'sinr': ('gauge', 'Signal to interference plus noise ratio in dB'),
+    'network_technology': ('info', 'Current mobile access technology'),
+    'network_band': ('info', 'Current mobile band'),
+    'wan_downloaded': ('counter', 'Bytes received on the WAN interfaces'),
+    'wan_uploaded': ('counter', 'Bytes sent on the WAN interfaces'),
+    'wan_ip_address': ('info', 'External IP address'),
+}
+
+# Exported for every LAN port, with the port name as label
+LAN_METRICS: dict[str, tuple[str, str]] = {
+    'lan_downloaded': ('counter', 'Bytes sent by the router to the LAN port'),
+    'lan_uploaded': ('counter', 'Bytes received by the router on the LAN port'),
+}
+
+POLL_METRICS: dict[str, tuple[str, str]] = {
+    'up': ('gauge', 'Whether the last poll of the router succeeded'),
+    'poll_duration_seconds': ('gauge', 'Duration of the last poll'),
+    'poll_errors': ('gauge', 'Endpoints that failed during the last poll'),
+    'last_poll_timestamp_seconds': ('gauge', 'Unix time of the last successful poll'),
+}
+
+
+def _metric_name(key: str, kind: str) -> str:
+    """Return the exported name of a metric."""
+    if kind == 'counter':
+        return f'{METRIC_PREFIX}_{key}_bytes_total'
+    if kind == 'info':
+        return f'{METRIC_PREFIX}_{key}_info'
+
+    return f'{METRIC_PREFIX}_{key}'
+
+
+def _escape(value) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+@dataclass
+class RouterSnapshot:
+    """Class to hold the rendered samples of a router's last poll."""
+
+    samples: dict[str, str] = field(default_factory=dict)
+    success: bool = False
+    elapsed: float = 0
+    errors: int = 0
+    timestamp: float = 0
+
+
+class RouterExporter:
+    """Poll routers concurrently and serve their cached readings."""
+
+    def __init__(self,
+                 routers: list[dict],
+                 scan_interval: float = DEFAULT_SCAN_INTERVAL,
+                 poll_timeout: float = DEFAULT_POLL_TIMEOUT,
+                 concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 order: str = DEFAULT_QUERY_ORDER) -> None:
+        """Initialise."""
+        self.routers = routers
+        self.scan_interval = scan_interval
+        self.poll_timeout = poll_timeout
+        self.concurrency = concurrency
+        self.order = order
+
+        self.snapshots: dict[str, RouterSnapshot] = {}
+        self._page: bytes | None = None
+        self._connector: aiohttp.TCPConnector | None = None
+        self._sessions: list[aiohttp.ClientSession] = []
+        self._tasks: list[asyncio.Task] = []
+
+    async def async_start(self) -> None:
+        """Start polling all routers."""
+        # One connection pool for all routers keeps connections alive
+        # between polls; every router gets its own cookie jar
+        self._connector = aiohttp.TCPConnector(ssl=False)
+
+        for index, router in enumerate(self.routers):
+            session = aiohttp.ClientSession(connector=self._connector,
+                                            connector_owner=False,
+                                            cookie_jar=aiohttp.CookieJar(unsafe=True))
+            self._sessions.append(session)
+
+            api = RouterAPI(host=router['host'],
+                            user=router.get('username', DEFAULT_USER),
+                            pwd=router['password'],
+                            session=session,
+                            schema=router.get('schema', API_SCHEMA))
+
+            # Spread the routers over the interval instead of polling all at once
+            delay = self.scan_interval * index / len(self.routers)
+            name = router.get('name', router['host'])
+
+            self._tasks.append(asyncio.create_task(
+                self._async_poll_loop(name, api, delay)))
+
+    async def async_stop(self) -> None:
+        """Stop polling and close all connections."""
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for session in self._sessions:
+            await session.close()
+
+        if self._connector is not None:
+            await self._connector.close()
+
+    async def _async_poll_loop(self, name: str, api: RouterAPI, delay: float) -> None:
+        """Poll a router every scan interval."""
+        interfaces = InterfaceResolver()
+
+        await asyncio.sleep(delay)
+
+        while True:
+            start = time.monotonic()
+
+            try:
+                result = await api.async_poll(oids=POLL_ENDPOINTS,
+                                              timeout=self.poll_timeout,
+                                              concurrency=self.concurrency,
+                                              order=self.order)
+            except Exception as err:
+                _LOGGER.warning("Unable to poll %s: %s", name, err)
+                self._update_snapshot(name, None, time.monotonic() - start)
+            else:
+                for endpoint, err in result.errors.items():
+                    _LOGGER.warning("Unable to query %s on %s: %s", endpoint, name, err)
+
+                if result.data:
+                    result.data[KEY_INTERFACES] = interfaces.resolve(result.data)
+
+                self._update_snapshot(name, result, result.elapsed)
+
+            await asyncio.sleep(max(0, self.scan_interval - (time.monotonic() - start)))
+
+    def _update_snapshot(self,
+                         name: str,
+                         result: RouterPollResult | None,
+                         elapsed: float) -> None:
+        """Render the samples of a poll and invalidate the cached page."""
+        previous = self.snapshots.get(name, RouterSnapshot())
+        label = f'router="{_escape(name)}"'
+
+        if result is None or not result.data:
+            # Keep the last readings so counters do not disappear on a failed poll
+            snapshot = RouterSnapshot(samples=previous.samples,
+                                      success=False,
+                                      elapsed=elapsed,
+                                      errors=len(result.errors) if result else 0,
+                                      timestamp=previous.timestamp)
+        else:
+            snapshot = RouterSnapshot(success=True,
+                                      elapsed=elapsed,
+                                      errors=len(result.errors),
+                                      timestamp=time.time())
+
+            for key, (kind, _) in METRICS.items():
+                value = EXTRACTORS[key](result.data)
+
+                if value is None:
+                    continue
+
+                if kind == 'info':
+                    snapshot.samples[key] = (
+                        f'{_metric_name(key, kind)}{{{label},value="{_escape(value)}"}} 1')
+                elif isinstance(value, (int, float)):
+                    snapshot.samples[key] = f'{_metric_name(key, kind)}{{{label}}} {value}'
+
+            for key, (kind, _) in LAN_METRICS.items():
+                lines = []
+
+                for port in result.data[KEY_INTERFACES].lan_ports:
+                    value = LAN_EXTRACTORS[key](result.data, port)
+
+                    if isinstance(value, (int, float)):
+                        lines.append(f'{_metric_name(key, kind)}'
+                                     f'{{{label},port="{_escape(port)}"}} {value}')
+
+                if lines:
+                    snapshot.samples[key] = '\n'.join(lines)
+
+        snapshot.samples.update({
+            'up': f'{METRIC_PREFIX}_up{{{label}}} {int(snapshot.success)}',
+            'poll_duration_seconds':
+                f'{METRIC_PREFIX}_poll_duration_seconds{{{label}}} {snapshot.elapsed:.3f}',
+            'poll_errors': f'{METRIC_PREFIX}_poll_errors{{{label}}} {snapshot.errors}',
+            'last_poll_timestamp_seconds':
+                f'{METRIC_PREFIX}_last_poll_timestamp_seconds{{{label}}} {snapshot.timestamp:.0f}',
+        })
+
+        self.snapshots[name] = snapshot
+        self._page = None
+
+    def render(self) -> bytes:
+        """Render all snapshots, grouped per metric as Prometheus requires."""
+        if self._page is None:
+            lines = []
+
+            for key, (kind, description) in (POLL_METRICS | METRICS | LAN_METRICS).items():
+                samples = [snapshot.samples[key]
+                           for snapshot in self.snapshots.values()
+                           if key in snapshot.samples]
+
+                if not samples:
+                    continue
+
+                name = (f'{METRIC_PREFIX}_{key}' if key in POLL_METRICS
+                        else _metric_name(key, kind))
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {"gauge" if kind == "info" else kind}')
+                lines.extend(samples)
+
+            self._page = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        return self._page
+
+    async def async_handle_metrics(self, request: web.Request) -> web.Response:
+        """Serve the cached metrics page."""
+        return web.Response(body=self.render(),
+                            headers={'Content-Type': CONTENT_TYPE})
+
+
+async def _async_run(config: dict) -> None:
+    """Run the exporter until interrupted."""
+    exporter = RouterExporter(routers=config['routers'],
+                              scan_interval=config.get('scan_interval', DEFAULT_SCAN_INTERVAL),
+                              poll_timeout=config.get('poll_timeout', DEFAULT_POLL_TIMEOUT),
+                              concurrency=config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+                              order=config.get('query_order', DEFAULT_QUERY_ORDER))
+
+    app = web.Application()
+    app.router.add_get('/metrics', exporter.async_handle_metrics)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, config.get('bind', '0.0.0.0'), config.get('port', DEFAULT_PORT)).start()
+    await exporter.async_start()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await exporter.async_stop()
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse the command line and run the exporter."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config', help='JSON file with the routers to poll')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+
+    with open(args.config, encoding='utf-8') as file:
+        config = json.load(file)
+
+    try:
+        asyncio.run(_async_run(config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Value extraction for the Odido Klik&Klaar 5G router.
+
+Works on the raw poll data (a dict of DAL objects keyed by oid) and does
+not depend on Home Assistant, so it can be used outside of it as well.
+"""
+
+import logging
+from typing import Any
+
+from .const import (EP_TRAFFIC,
+                    EP_COMMON,
+                    KEY_INTERFACES,
+                    KEY_USAGE)
+from .interfaces import InterfaceIndex
+from .usage import UsageMeter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_value(data: dict, endpoint: str, path: list[int | str], default=None) -> Any:
+    """
+    Get a value from the data by a given path.
+    When the value is absent, the default (None) will be returned and an error will be logged.
+    """
+    value = data.get(endpoint, default)
+
+    try:
+        for key in path:
+            value = value[key]
+
+        value_type = type(value).__name__
+
+        if value_type in ["int", "float", "str"]:
+            _LOGGER.debug(
+                "Path %s returns a %s (value = %s)", path, value_type, value
+            )
+        else:
+            _LOGGER.debug("Path %s returns a %s", path, value_type)
+
+        return value
+    except (IndexError, KeyError, TypeError):
+        _LOGGER.warning("Can't find a value for %s in the API response", path)
+        return default
+
+
+def _index(data: dict) -> InterfaceIndex:
+    """Return the interface lookup table the coordinator stored in the data."""
+    return data.get(KEY_INTERFACES) or InterfaceIndex()
+
+
+def wan_counter(data: dict, counter: str) -> int | None:
+    """Sum a traffic counter over all WAN interfaces."""
+    index = _index(data)
+
+    if not index.wan:
+        return None
+
+    try:
+        stats = data[EP_TRAFFIC]['ipIfaceSt']
+        return sum(stats[position][counter] for position in index.wan)
+    except (IndexError, KeyError, TypeError):
+        _LOGGER.warning("Can't find %s of the WAN interfaces in the API response", counter)
+        return None
+
+
+def wan_counters(data: dict, counter: str) -> dict[str, int | None] | None:
+    """Return a traffic counter of every WAN interface by its name.
+
+    Returns None when the poll has no WAN interfaces or traffic statistics.
+    """
+    index = _index(data)
+    stats = (data.get(EP_TRAFFIC) or {}).get('ipIfaceSt')
+
+    if not index.wan or not isinstance(stats, list):
+        return None
+
+    values: dict[str, int | None] = {}
+
+    for position, name in zip(index.wan, index.wan_names):
+        try:
+            values[name] = stats[position][counter]
+        except (IndexError, KeyError, TypeError):
+            _LOGGER.warning("Can't find %s of WAN interface %s in the API response", counter, name)
+            values[name] = None
+
+    return values
+
+
+def lan_counter(data: dict, port: str, counter: str) -> int | None:
+    """Return a traffic counter of a LAN port by its name."""
+    position = _index(data).lan_ports.get(port)
+
+    if position is None:
+        return None
+
+    return get_value(data, EP_TRAFFIC, ['ethIfaceSt', position, counter])
+
+
+def wan_address(data: dict) -> str | None:
+    """Return the IPv4 address of the WAN interface."""
+    position = _index(data).wan_address
+
+    if position is None:
+        return None
+
+    return get_value(data, EP_COMMON, ['WanLanInfo', position, 'IPv4Address', 0, 'IPAddress'])
+
+
+def usage(data: dict, bucket: str, counter: str) -> int | None:
+    """Return the usage of the current day or month the coordinator stored in the data."""
+    meter: UsageMeter | None = data.get(KEY_USAGE)
+
+    if meter is None:
+        return None
+
+    return meter.usage(bucket, counter)
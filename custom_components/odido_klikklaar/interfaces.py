@@ -0,0 +1,181 @@
+"""Interface lookup table for the Odido Klik&Klaar 5G router.
+
+Resolves the WAN interfaces, LAN ports and the WAN address by name instead
+of by their position in the DAL lists, which differs between firmwares.
+Does not depend on Home Assistant.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import logging
+
+from .const import (EP_TRAFFIC,
+                    EP_COMMON)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Keys holding the name of an interface, in order of preference
+NAME_KEYS = ('X_ZYXEL_SrvName', 'X_ZYXEL_LanPort', 'Alias', 'X_ZYXEL_IfName', 'Name')
+TYPE_KEYS = ('X_ZYXEL_Type', 'X_ZYXEL_ConnectionType', 'Type')
+# Only these values of the type keys tell the side of an interface, others
+# such as IP_Routed or Wi-Fi describe something else
+SIDE_TYPES = ('WAN', 'LAN')
+WAN_NAMES = ('wan', 'wwan', 'internet', 'cellular', 'ims')
+
+# Positions used by the firmware this integration was written against,
+# for payloads that do not describe their interfaces or in which no WAN
+# interface is recognised
+LEGACY_WAN = (1, 2)
+LEGACY_WAN_ADDRESS = 1
+
+
+@dataclass(frozen=True)
+class InterfaceIndex:
+    """Class to hold the positions of the interfaces in the DAL lists."""
+
+    signature: tuple = ()
+    wan: tuple[int, ...] = ()
+    # Unique name of every WAN interface, in the order of wan
+    wan_names: tuple[str, ...] = ()
+    lan_ports: dict[str, int] = field(default_factory=dict)
+    wan_address: int | None = None
+
+
+def _entries(data: dict, endpoint: str, key: str) -> list[dict]:
+    """Return a list of interface entries, or an empty list."""
+    entries = (data.get(endpoint) or {}).get(key)
+
+    return entries if isinstance(entries, list) else []
+
+
+def _name(entry: dict) -> str:
+    """Return the name of an interface entry."""
+    for key in NAME_KEYS:
+        if entry.get(key):
+            return str(entry[key])
+
+    return ''
+
+
+def _is_wan(entry: dict) -> bool:
+    """Tell whether an interface entry is a WAN interface."""
+    for key in TYPE_KEYS:
+        side = str(entry.get(key) or '').strip().upper()
+
+        if side in SIDE_TYPES:
+            return side == 'WAN'
+
+    name = _name(entry).lower()
+
+    return any(wan_name in name for wan_name in WAN_NAMES)
+
+
+def _signature(data: dict) -> tuple:
+    """Return what identifies the current interface lists."""
+    return (
+        tuple(_name(entry) for entry in _entries(data, EP_TRAFFIC, 'ipIface')),
+        len(_entries(data, EP_TRAFFIC, 'ipIfaceSt')),
+        tuple(_name(entry) for entry in _entries(data, EP_TRAFFIC, 'ethIface')),
+        len(_entries(data, EP_TRAFFIC, 'ethIfaceSt')),
+        tuple(_name(entry) for entry in _entries(data, EP_COMMON, 'WanLanInfo')),
+    )
+
+
+def _described(entries: list[dict]) -> bool:
+    """Tell whether the entries carry names or types to resolve them by."""
+    return any(entry.get(key) for entry in entries for key in (*TYPE_KEYS, *NAME_KEYS))
+
+
+def _unique(names: Iterable[str]) -> tuple[str, ...]:
+    """Number repeated names, like Internet and Internet#2."""
+    unique: list[str] = []
+
+    for name in names:
+        candidate, number = name, 1
+
+        while candidate in unique:
+            number += 1
+            candidate = f'{name}#{number}'
+
+        unique.append(candidate)
+
+    return tuple(unique)
+
+
+def build_interface_index(data: dict, signature: tuple | None = None) -> InterfaceIndex:
+    """Build the interface lookup table from a poll's data."""
+    ip_ifaces = _entries(data, EP_TRAFFIC, 'ipIface')
+    ip_stats = _entries(data, EP_TRAFFIC, 'ipIfaceSt')
+    eth_ifaces = _entries(data, EP_TRAFFIC, 'ethIface')
+    eth_stats = _entries(data, EP_TRAFFIC, 'ethIfaceSt')
+    wan_lan_info = _entries(data, EP_COMMON, 'WanLanInfo')
+
+    wan: tuple[int, ...] = ()
+
+    if _described(ip_ifaces):
+        wan = tuple(index for index, entry in enumerate(ip_ifaces[:len(ip_stats)])
+                    if _is_wan(entry))
+
+    if not wan:
+        # Nothing described or recognised as WAN, assume the known layout
+        wan = tuple(index for index in LEGACY_WAN if index < len(ip_stats))
+
+    if _described(eth_ifaces):
+        lan_ports = {
+            _name(entry) or f'LAN{index + 1}': index
+            for index, entry in enumerate(eth_ifaces[:len(eth_stats)])
+            if not _is_wan(entry)
+        }
+    else:
+        lan_ports = {f'LAN{index + 1}': index for index in range(len(eth_stats))}
+
+    wan_entries: list[int] = []
+
+    if _described(wan_lan_info):
+        wan_entries = [index for index, entry in enumerate(wan_lan_info) if _is_wan(entry)]
+
+    if wan_entries:
+        wan_address = next((index for index in wan_entries
+                            if wan_lan_info[index].get('IPv4Address')),
+                           None)
+    elif len(wan_lan_info) > LEGACY_WAN_ADDRESS:
+        # Nothing described or recognised as WAN, assume the known layout
+        wan_address = LEGACY_WAN_ADDRESS
+    else:
+        wan_address = None
+
+    wan_names = _unique(
+        (_name(ip_ifaces[index]) if index < len(ip_ifaces) else '') or f'ipIface{index}'
+        for index in wan)
+
+    return InterfaceIndex(signature=signature if signature is not None else _signature(data),
+                          wan=wan,
+                          wan_names=wan_names,
+                          lan_ports=lan_ports,
+                          wan_address=wan_address)
+
+
+class InterfaceResolver:
+    """Keep the interface lookup table of a router up to date.
+
+    The table is only rebuilt when the list of interfaces changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialise."""
+        self.index = InterfaceIndex()
+
+    def resolve(self, data: dict) -> InterfaceIndex:
+        """Return the lookup table for a poll's data."""
+        # Keep the table when the interface lists were not part of this poll
+        if EP_TRAFFIC not in data or EP_COMMON not in data:
+            return self.index
+
+        signature = _signature(data)
+
+        if signature != self.index.signature:
+            self.index = build_interface_index(data, signature)
+            _LOGGER.debug("Interfaces changed, WAN at %s, LAN ports %s, WAN address at %s",
+                          self.index.wan, self.index.lan_ports, self.index.wan_address)
+
+        return self.index
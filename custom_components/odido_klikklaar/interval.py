@@ -0,0 +1,85 @@
+"""Adaptive poll interval for the Odido Klik&Klaar 5G router"""
+
+import logging
+
+from .const import (ADAPTIVE_FAST_LATENCY,
+                    ADAPTIVE_SLOW_LATENCY,
+                    ADAPTIVE_FAST_POLLS,
+                    ADAPTIVE_SPEEDUP_FACTOR,
+                    ADAPTIVE_SLOWDOWN_FACTOR,
+                    ADAPTIVE_BACKOFF_FACTOR,
+                    ADAPTIVE_LATENCY_WEIGHT,
+                    ADAPTIVE_FAILURE_RATIO)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdaptiveInterval:
+    """Derive the poll interval from observed router latency and failures.
+
+    A failed poll backs off immediately, a slow router is polled a bit less
+    often and the interval only shrinks after several consecutive fast polls.
+    Latencies between the fast and slow thresholds keep the current interval,
+    which prevents the interval from flapping. A poll only counts as failed
+    when most of its queries failed, so a single oid the firmware does not
+    support does not keep the interval at its maximum.
+    """
+
+    def __init__(self,
+                 interval: float,
+                 minimum: float,
+                 maximum: float) -> None:
+        """Initialise."""
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.interval = self._clamp(interval)
+        self.latency: float | None = None
+        self.fast_polls = 0
+        self.failures = 0
+
+    def record(self, latency: float, failure_ratio: float = 0.0) -> float:
+        """Record the outcome of a poll and return the new interval.
+
+        The failure ratio is the fraction of the queries of the poll that failed.
+        """
+        interval = self.interval
+
+        if failure_ratio >= ADAPTIVE_FAILURE_RATIO:
+            # The latency of a failed poll is mostly its timeout, which the
+            # back-off already accounts for, so it is kept out of the average
+            self.failures += 1
+            self.fast_polls = 0
+            interval *= ADAPTIVE_BACKOFF_FACTOR
+        else:
+            self.failures = 0
+
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += ADAPTIVE_LATENCY_WEIGHT * (latency - self.latency)
+
+            if self.latency >= ADAPTIVE_SLOW_LATENCY:
+                self.fast_polls = 0
+                interval *= ADAPTIVE_SLOWDOWN_FACTOR
+            elif self.latency <= ADAPTIVE_FAST_LATENCY:
+                self.fast_polls += 1
+
+                if self.fast_polls >= ADAPTIVE_FAST_POLLS:
+                    self.fast_polls = 0
+                    interval *= ADAPTIVE_SPEEDUP_FACTOR
+            else:
+                self.fast_polls = 0
+
+        interval = self._clamp(interval)
+
+        if interval != self.interval:
+            _LOGGER.debug(
+                "Poll interval changed from %ss to %ss (latency %s, failures %s)",
+                self.interval, interval, self.latency, self.failures)
+            self.interval = interval
+
+        return self.interval
+
+    def _clamp(self, interval: float) -> int:
+        """Round the interval to whole seconds within the bounds."""
+        return int(round(min(self.maximum, max(self.minimum, interval))))
@@ -0,0 +1,34 @@
+"""Query planner for the Odido Klik&Klaar 5G router"""
+
+from .const import (QUERY_ORDER_FIXED,
+                    QUERY_ORDER_FASTEST_FIRST,
+                    QUERY_ORDER_SLOWEST_FIRST)
+
+
+def plan_queries(oids: list[str],
+                 order: str = QUERY_ORDER_FIXED,
+                 latency: dict[str, float] | None = None,
+                 estimate: float = float('inf')) -> list[str]:
+    """Return the unique oids in the order they should be requested.
+
+    Oids without a measured latency are assumed to take the estimate,
+    normally the poll budget, so an unknown oid cannot use up the budget
+    before the fast ones got their turn. They are still requested before
+    measured oids that are just as slow, such as ones that overran the
+    budget before, so they get measured eventually.
+    """
+    planned = list(dict.fromkeys(oids))
+
+    if order == QUERY_ORDER_FIXED or not latency:
+        return planned
+
+    if order not in (QUERY_ORDER_FASTEST_FIRST, QUERY_ORDER_SLOWEST_FIRST):
+        raise ValueError(f'Unknown query order {order}')
+
+    reverse = order == QUERY_ORDER_SLOWEST_FIRST
+
+    def key(oid: str) -> tuple[float, bool]:
+        measured = oid in latency
+        return latency.get(oid, estimate), measured != reverse
+
+    return sorted(planned, key=key, reverse=reverse)
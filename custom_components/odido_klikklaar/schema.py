@@ -0,0 +1,323 @@
+"""Declarative sensor schema for the Odido Klik&Klaar 5G router.
+
+Every sensor is a row naming the DAL object (oid) it reads, a path into
+that object or an aggregate expression, and how it is presented. The
+table is validated and compiled once, at import, into extractor functions
+and the list of endpoints a poll needs. Does not depend on Home Assistant.
+
+A path is a dot separated list of keys, where numbers index lists:
+
+    SensorSpec(key='rssi', oid=EP_CELLINFO, path='CellIntfInfo.RSSI')
+
+An aggregate calls one of the functions in AGGREGATES with the given
+arguments:
+
+    SensorSpec(key='wan_downloaded', oid=EP_TRAFFIC, aggregate='wan_sum(BytesReceived)')
+"""
+
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+import logging
+import re
+from typing import Any
+
+from .const import (EP_CELLINFO,
+                    EP_DEVICESTATUS,
+                    EP_TRAFFIC,
+                    EP_COMMON,
+                    TRAFFIC_COUNTERS,
+                    USAGE_COUNTERS)
+from .extract import lan_counter, usage, wan_address, wan_counter
+from .usage import PERIODS
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLASSES = ('measurement', 'total', 'total_increasing')
+# Values of SensorDeviceClass in Home Assistant 2025.5
+DEVICE_CLASSES = (
+    'date', 'enum', 'timestamp', 'apparent_power', 'aqi', 'area', 'atmospheric_pressure',
+    'battery', 'blood_glucose_concentration', 'carbon_monoxide', 'carbon_dioxide',
+    'conductivity', 'current', 'data_rate', 'data_size', 'distance', 'duration', 'energy',
+    'energy_distance', 'energy_storage', 'frequency', 'gas', 'humidity', 'illuminance',
+    'irradiance', 'moisture', 'monetary', 'nitrogen_dioxide', 'nitrogen_monoxide',
+    'nitrous_oxide', 'ozone', 'ph', 'pm1', 'pm10', 'pm25', 'power_factor', 'power',
+    'precipitation', 'precipitation_intensity', 'pressure', 'reactive_power',
+    'signal_strength', 'sound_pressure', 'speed', 'sulphur_dioxide', 'temperature',
+    'volatile_organic_compounds', 'volatile_organic_compounds_parts', 'voltage', 'volume',
+    'volume_storage', 'volume_flow_rate', 'water', 'weight', 'wind_direction', 'wind_speed',
+)
+
+# The interface index is built from both objects, see interfaces.py
+INTERFACE_ENDPOINTS = (EP_TRAFFIC, EP_COMMON)
+
+_AGGREGATE = re.compile(r'^(\w+)\((.*)\)$')
+_OID = re.compile(r'^\w+$')
+
+
+class SchemaError(ValueError):
+    """Error to indicate an invalid sensor schema."""
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Class describing an aggregate expression."""
+
+    # Called with the arguments of the expression, returns the extractor
+    factory: Callable[..., Callable]
+    # Objects the extractor needs besides the oid of the sensor
+    endpoints: tuple[str, ...] = ()
+    # Allowed values of every argument of the expression
+    arguments: tuple[Collection[str], ...] = ()
+
+
+AGGREGATES: dict[str, Aggregate] = {
+    'wan_sum': Aggregate(
+        factory=lambda counter: lambda data: wan_counter(data, counter),
+        endpoints=INTERFACE_ENDPOINTS,
+        arguments=(TRAFFIC_COUNTERS,)),
+    'wan_address': Aggregate(
+        factory=lambda: wan_address,
+        endpoints=INTERFACE_ENDPOINTS),
+    # The usage meters are fed with the WAN counters by the coordinator
+    'usage': Aggregate(
+        factory=lambda bucket, counter: lambda data: usage(data, bucket, counter),
+        endpoints=INTERFACE_ENDPOINTS,
+        arguments=(PERIODS, USAGE_COUNTERS)),
+    # Extractors of LAN port sensors are called with the data and the port name
+    'lan_counter': Aggregate(
+        factory=lambda counter: lambda data, port: lan_counter(data, port, counter),
+        endpoints=INTERFACE_ENDPOINTS,
+        arguments=(TRAFFIC_COUNTERS,)),
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class SensorSpec:
+    """Class describing a sensor of the schema."""
+
+    key: str
+    oid: str
+    path: str | None = None
+    aggregate: str | None = None
+    unit: str | None = None
+    suggested_unit: str | None = None
+    device_class: str | None = None
+    state_class: str | None = None
+    icon: str | None = None
+    enabled: bool = False
+
+
+def compile_path(oid: str, path: str) -> Callable[[dict], Any]:
+    """Return an extractor that walks a path into an object of the poll data."""
+    keys = tuple(int(key) if key.isdigit() else key for key in path.split('.'))
+
+    def extract(data: dict) -> Any:
+        value = data.get(oid)
+
+        try:
+            for key in keys:
+                value = value[key]
+        except (IndexError, KeyError, TypeError):
+            _LOGGER.warning("Can't find a value for %s in the API response", path)
+            return None
+
+        return value
+
+    return extract
+
+
+def _parse_aggregate(expression: str) -> tuple[Aggregate, list[str]]:
+    """Return the aggregate and the arguments of an expression."""
+    match = _AGGREGATE.match(expression.strip())
+
+    if match is None or match[1] not in AGGREGATES:
+        raise SchemaError(f'Unknown aggregate expression {expression}')
+
+    args = [arg.strip() for arg in match[2].split(',') if arg.strip()]
+
+    return AGGREGATES[match[1]], args
+
+
+def compile_sensor(spec: SensorSpec) -> Callable:
+    """Validate a sensor and return its extractor."""
+    if not _OID.match(spec.oid):
+        raise SchemaError(f'Sensor {spec.key} has an invalid oid {spec.oid}')
+
+    if (spec.path is None) == (spec.aggregate is None):
+        raise SchemaError(f'Sensor {spec.key} needs either a path or an aggregate')
+
+    if spec.state_class is not None and spec.state_class not in STATE_CLASSES:
+        raise SchemaError(f'Sensor {spec.key} has an unknown state class {spec.state_class}')
+
+    if spec.device_class is not None and spec.device_class not in DEVICE_CLASSES:
+        raise SchemaError(f'Sensor {spec.key} has an unknown device class {spec.device_class}')
+
+    if spec.path is not None:
+        return compile_path(spec.oid, spec.path)
+
+    aggregate, args = _parse_aggregate(spec.aggregate)
+
+    if len(args) != len(aggregate.arguments):
+        raise SchemaError(f'Sensor {spec.key} needs {len(aggregate.arguments)} arguments '
+                          f'in {spec.aggregate}')
+
+    for arg, allowed in zip(args, aggregate.arguments):
+        if arg not in allowed:
+            raise SchemaError(f'Sensor {spec.key} has an unknown argument {arg} '
+                              f'in {spec.aggregate}')
+
+    return aggregate.factory(*args)
+
+
+def compile_schema(specs: list[SensorSpec]) -> dict[str, Callable]:
+    """Validate a table of sensors and return the extractor per sensor key."""
+    extractors: dict[str, Callable] = {}
+
+    for spec in specs:
+        if spec.key in extractors:
+            raise SchemaError(f'Sensor {spec.key} is defined twice')
+
+        extractors[spec.key] = compile_sensor(spec)
+
+    return extractors
+
+
+def required_endpoints(*tables: list[SensorSpec]) -> list[str]:
+    """Return the unique objects a poll needs to update all sensors of the tables."""
+    endpoints: list[str] = []
+
+    for spec in (spec for table in tables for spec in table):
+        endpoints.append(spec.oid)
+
+        if spec.aggregate is not None:
+            endpoints.extend(_parse_aggregate(spec.aggregate)[0].endpoints)
+
+    return list(dict.fromkeys(endpoints))
+
+
+SENSORS: list[SensorSpec] = [
+    SensorSpec(key='rssi',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.RSSI',
+               unit='dBA',
+               device_class='sound_pressure',
+               state_class='measurement',
+               icon='mdi:wifi-check',
+               enabled=True),
+    SensorSpec(key='rsrq',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.X_ZYXEL_RSRQ',
+               unit='dB',
+               device_class='sound_pressure',
+               state_class='measurement',
+               icon='mdi:wifi-arrow-up-down'),
+    SensorSpec(key='rsrp',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.X_ZYXEL_RSRP',
+               unit='dBA',
+               device_class='sound_pressure',
+               state_class='measurement',
+               icon='mdi:wifi-arrow-down'),
+    SensorSpec(key='sinr',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.X_ZYXEL_SINR',
+               state_class='measurement',
+               icon='mdi:wifi-alert'),
+    SensorSpec(key='network_technology',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.CurrentAccessTechnology',
+               icon='mdi:radio-tower',
+               enabled=True),
+    SensorSpec(key='network_band',
+               oid=EP_CELLINFO,
+               path='CellIntfInfo.X_ZYXEL_CurrentBand',
+               icon='mdi:signal-5g'),
+    SensorSpec(key='wan_downloaded',
+               oid=EP_TRAFFIC,
+               aggregate='wan_sum(BytesReceived)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total',
+               icon='mdi:cloud-download'),
+    SensorSpec(key='wan_uploaded',
+               oid=EP_TRAFFIC,
+               aggregate='wan_sum(BytesSent)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total',
+               icon='mdi:cloud-upload'),
+    SensorSpec(key='wan_downloaded_today',
+               oid=EP_TRAFFIC,
+               aggregate='usage(day, downloaded)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total_increasing',
+               icon='mdi:cloud-download-outline',
+               enabled=True),
+    SensorSpec(key='wan_uploaded_today',
+               oid=EP_TRAFFIC,
+               aggregate='usage(day, uploaded)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total_increasing',
+               icon='mdi:cloud-upload-outline',
+               enabled=True),
+    SensorSpec(key='wan_downloaded_this_month',
+               oid=EP_TRAFFIC,
+               aggregate='usage(month, downloaded)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total_increasing',
+               icon='mdi:cloud-download-outline',
+               enabled=True),
+    SensorSpec(key='wan_uploaded_this_month',
+               oid=EP_TRAFFIC,
+               aggregate='usage(month, uploaded)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total_increasing',
+               icon='mdi:cloud-upload-outline',
+               enabled=True),
+    SensorSpec(key='wan_ip_address',
+               oid=EP_COMMON,
+               aggregate='wan_address()',
+               icon='mdi:ip-network'),
+]
+
+# Created for every LAN port the router reports. Sent and received are
+# reversed, because what the router sends to a port is what the port
+# downloads and vice versa.
+LAN_SENSORS: list[SensorSpec] = [
+    SensorSpec(key='lan_downloaded',
+               oid=EP_TRAFFIC,
+               aggregate='lan_counter(BytesSent)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total',
+               icon='mdi:download-network'),
+    SensorSpec(key='lan_uploaded',
+               oid=EP_TRAFFIC,
+               aggregate='lan_counter(BytesReceived)',
+               unit='B',
+               suggested_unit='GB',
+               device_class='data_size',
+               state_class='total',
+               icon='mdi:upload-network'),
+]
+
+# Extractor per sensor key, called with the data of a single poll
+EXTRACTORS: dict[str, Callable[[dict], Any]] = compile_schema(SENSORS)
+
+# Extractor per LAN port sensor key, called with the data and the port name
+LAN_EXTRACTORS: dict[str, Callable[[dict, str], Any]] = compile_schema(LAN_SENSORS)
+
+# Objects every poll requests, the device status is needed for the device info
+POLL_ENDPOINTS: list[str] = list(dict.fromkeys([*required_endpoints(SENSORS, LAN_SENSORS),
+                                                 EP_DEVICESTATUS]))
@@ -1,8 +1,10 @@
 """Sensor platform for knmi."""
 
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import partial
+import re
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -12,25 +14,16 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    CONF_NAME,
-    PERCENTAGE,
-    UnitOfSoundPressure,
-    UnitOfDataRate
-)
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import (DOMAIN,
-                    EP_CELLINFO,
-                    EP_DEVICESTATUS,
-                    EP_LANINFO,
-                    EP_TRAFFIC,
-                    EP_COMMON)
 from .coordinator import RouterCoordinator
+from .schema import EXTRACTORS, LAN_EXTRACTORS, LAN_SENSORS, SENSORS, SensorSpec
 
 
 @dataclass(kw_only=True, frozen=True)
@@ -41,171 +34,85 @@ class RouterSensorDescription(SensorEntityDescription):
     attr_fn: Callable[[dict[str, Any]], dict[str, Any]] = lambda _: {}
 
 
+def _description(spec: SensorSpec, value_fn: Callable) -> RouterSensorDescription:
+    """Return the entity description of a sensor of the schema."""
+    return RouterSensorDescription(
+        key=spec.key,
+        icon=spec.icon,
+        value_fn=value_fn,
+        native_unit_of_measurement=spec.unit,
+        suggested_unit_of_measurement=spec.suggested_unit,
+        device_class=SensorDeviceClass(spec.device_class) if spec.device_class else None,
+        state_class=SensorStateClass(spec.state_class) if spec.state_class else None,
+        translation_key=spec.key,
+        entity_registry_enabled_default=spec.enabled,
+    )
+
+
 DESCRIPTIONS: list[RouterSensorDescription] = [
-    RouterSensorDescription(
-        key='rssi',
-        icon='mdi:wifi-check',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "RSSI"]),
-        native_unit_of_measurement=UnitOfSoundPressure.WEIGHTED_DECIBEL_A,
-        device_class=SensorDeviceClass.SOUND_PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        translation_key='rssi',
-        entity_registry_enabled_default=True,
-    ),
-    RouterSensorDescription(
-        key='rsrq',
-        icon='mdi:wifi-arrow-up-down',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "X_ZYXEL_RSRQ"]),
-        native_unit_of_measurement=UnitOfSoundPressure.DECIBEL,
-        device_class=SensorDeviceClass.SOUND_PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        translation_key='rsrq',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='rsrp',
-        icon='mdi:wifi-arrow-down',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "X_ZYXEL_RSRP"]),
-        native_unit_of_measurement=UnitOfSoundPressure.WEIGHTED_DECIBEL_A,
-        device_class=SensorDeviceClass.SOUND_PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        translation_key='rsrp',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='sinr',
-        icon='mdi:wifi-alert',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "X_ZYXEL_SINR"]),
-        state_class=SensorStateClass.MEASUREMENT,
-        translation_key='sinr',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='network_technology',
-        icon='mdi:radio-tower',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "CurrentAccessTechnology"]),
-        translation_key='network_technology',
-        entity_registry_enabled_default=True
-    ),
-    RouterSensorDescription(
-        key='network_band',
-        icon='mdi:signal-5g',
-        value_fn=lambda coordinator: coordinator.get_value(EP_CELLINFO, ["CellIntfInfo", "X_ZYXEL_CurrentBand"]),
-        translation_key='network_band',
-        entity_registry_enabled_default=False,
-    ),
-    RouterSensorDescription(
-        key='wan_downloaded',
-        icon='mdi:cloud-download',
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ipIfaceSt', 1, 'BytesReceived']) \
-            + coordinator.get_value(EP_TRAFFIC, ['ipIfaceSt', 2, 'BytesReceived']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='wan_downloaded',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='wan_uploaded',
-        icon='mdi:cloud-upload',
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ipIfaceSt', 1, 'BytesSent']) \
-            + coordinator.get_value(EP_TRAFFIC, ['ipIfaceSt', 2, 'BytesSent']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='wan_uploaded',
-        entity_registry_enabled_default=False,
-        
-    ),
-    RouterSensorDescription(
-        key='lan1_downloaded',
-        icon='mdi:download-network',
-        # Reverse sent because the is what the router is sending to the port
-        # thus what the port is downloading
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ethIfaceSt', 0, 'BytesSent']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='lan1_downloaded',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='lan1_uploaded',
-        icon='mdi:upload-network',
-        # Reverse receive because the is what the router is receiving to the port
-        # thus what the port is uploading
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ethIfaceSt', 0, 'BytesReceived']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='lan1_uploaded',
-        entity_registry_enabled_default=False,
-        
-    ),
-    RouterSensorDescription(
-        key='lan2_downloaded',
-        icon='mdi:download-network',
-        # Reverse sent because the is what the router is sending to the port
-        # thus what the port is downloading
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ethIfaceSt', 1, 'BytesSent']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='lan2_downloaded',
-        entity_registry_enabled_default=False
-    ),
-    RouterSensorDescription(
-        key='lan2_uploaded',
-        icon='mdi:upload-network',
-        # Reverse receive because the is what the router is receiving to the port
-        # thus what the port is uploading
-        value_fn=lambda coordinator: coordinator.get_value(EP_TRAFFIC, ['ethIfaceSt', 1, 'BytesReceived']),
-        native_unit_of_measurement='B',
-        suggested_unit_of_measurement='GB',
-        device_class=SensorDeviceClass.DATA_SIZE,
-        state_class=SensorStateClass.TOTAL,
-        translation_key='lan2_uploaded',
-        entity_registry_enabled_default=False,
-        
-    ),
-    RouterSensorDescription(
-        key='wan_ip_address',
-        icon='mdi:ip-network',
-        value_fn=lambda coordinator: coordinator.get_value(EP_COMMON, ['WanLanInfo', 1, 'IPv4Address', 0, 'IPAddress']),
-        translation_key='wan_ip_address',
-        entity_registry_enabled_default=False
-    ),
-    # RouterSensorDescription(
-    #     key='network_devices',
-    #     state_class=SensorStateClass.MEASUREMENT,
-    #     translation_key='network_devices',
-    #     entity_registry_enabled_default=True
-    # )
+    _description(spec, EXTRACTORS[spec.key]) for spec in SENSORS
+]
+
+# Created for every LAN port the router reports, see async_setup_entry
+LAN_DESCRIPTIONS: list[RouterSensorDescription] = [
+    _description(spec, LAN_EXTRACTORS[spec.key]) for spec in LAN_SENSORS
 ]
 
 
+def lan_port_descriptions(port: str) -> list[RouterSensorDescription]:
+    """Return the sensor descriptions of a LAN port."""
+    # A port named LAN1 keeps the key lan1_downloaded it had when the
+    # ports were still looked up by position
+    slug = re.sub(r'\W+', '_', port.lower())
+
+    return [
+        replace(description,
+                key=description.key.replace('lan', slug, 1),
+                value_fn=partial(description.value_fn, port=port),
+                translation_placeholders={'port': port})
+        for description in LAN_DESCRIPTIONS
+    ]
+
+
+@callback
+def _migrate_unique_id(entry: ConfigEntry, entity: er.RegistryEntry) -> dict[str, Any] | None:
+    """Prefix the unique id with the entry id instead of the name.
+
+    The config flow never sets a name, so the sensors of every router got
+    the same unique ids and only those of the first router were added.
+    """
+    prefix = f"{entry.data.get(CONF_NAME)}_".lower()
+
+    if not entity.unique_id.startswith(prefix):
+        return None
+
+    return {"new_unique_id": f"{entry.entry_id}_{entity.unique_id.removeprefix(prefix)}"}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Router sensors based on a config entry."""
-    conf_name = entry.data.get(CONF_NAME)
+    await er.async_migrate_entries(hass, entry.entry_id, partial(_migrate_unique_id, entry))
+
     coordinator = entry.runtime_data.coordinator
     #coordinator = hass.data[DOMAIN][entry.entry_id]
 
     entities: list[RouterSensor] = []
 
+    descriptions = list(DESCRIPTIONS)
+
+    # The LAN ports the router reported during the first refresh
+    for port in coordinator.interfaces.index.lan_ports:
+        descriptions.extend(lan_port_descriptions(port))
+
     # Add all sensors described above.
-    for description in DESCRIPTIONS:
+    for description in descriptions:
         entities.append(
             RouterSensor(
-                conf_name=conf_name,
+                entry_id=entry.entry_id,
                 coordinator=coordinator,
                 description=description,
             )
@@ -222,7 +129,7 @@ class RouterSensor(CoordinatorEntity[RouterCoordinator], SensorEntity):
 
     def __init__(
         self,
-        conf_name: str,
+        entry_id: str,
         coordinator: RouterCoordinator,
         description: SensorEntityDescription,
     ) -> None:
@@ -231,17 +138,17 @@ class RouterSensor(CoordinatorEntity[RouterCoordinator], SensorEntity):
 
         #self._attr_attribution = self.coordinator.get_value(["api", 0, "bron"])
         self._attr_device_info = coordinator.device_info
-        self._attr_unique_id = f"{conf_name}_{description.key}".lower()
+        self._attr_unique_id = f"{entry_id}_{description.key.lower()}"
 
         self.entity_description = description
 
     @property
     def native_value(self) -> StateType:
         """Return the state."""
-        return self.entity_description.value_fn(self.coordinator)
+        return self.entity_description.value_fn(self.coordinator.data)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        return self.entity_description.attr_fn(self.coordinator)
+        return self.entity_description.attr_fn(self.coordinator.data)
     
\ No newline at end of file
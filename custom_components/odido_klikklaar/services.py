@@ -0,0 +1,63 @@
+"""Services for the Odido Klik&Klaar 5G router."""
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .api import RouterAPIAuthError, RouterAPIConnectionError, RouterAPIInvalidResponse
+from .const import (DOMAIN,
+                    SERVICE_QUERY_OID,
+                    ATTR_CONFIG_ENTRY_ID,
+                    ATTR_OID,
+                    ATTR_MAX_AGE,
+                    QUERY_CACHE_TTL)
+
+_LOGGER = logging.getLogger(__name__)
+
+QUERY_OID_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_OID): cv.string,
+        vol.Optional(ATTR_MAX_AGE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=QUERY_CACHE_TTL)),
+    }
+)
+
+
+async def _async_query_oid(call: ServiceCall) -> ServiceResponse:
+    """Return a DAL object from the cache of the router, or from the router."""
+    entry = call.hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            f"Config entry {call.data[ATTR_CONFIG_ENTRY_ID]} is not an Odido router")
+
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"Router {entry.title} is not loaded")
+
+    oid = call.data[ATTR_OID]
+
+    try:
+        data = await entry.runtime_data.coordinator.query_cache.async_query(
+            oid, call.data.get(ATTR_MAX_AGE))
+    except (RouterAPIAuthError,
+            RouterAPIConnectionError,
+            RouterAPIInvalidResponse,
+            TimeoutError) as err:
+        raise HomeAssistantError(f"Unable to query {oid}: {err}") from err
+
+    return {ATTR_OID: oid, "data": data}
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the services, once for all routers."""
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_QUERY_OID,
+                                 _async_query_oid,
+                                 schema=QUERY_OID_SCHEMA,
+                                 supports_response=SupportsResponse.ONLY)
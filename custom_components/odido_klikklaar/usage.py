@@ -0,0 +1,114 @@
+"""Data usage meters for the Odido Klik&Klaar 5G router.
+
+Accumulates the growth of the WAN byte counters into day and month
+buckets, so data caps can be tracked without utility meter helpers.
+Every WAN interface is tracked on its own, so a reset of one interface or
+a change of the WAN interfaces only affects the traffic of that interface.
+The state is a small dict that can be persisted as is. Does not depend
+on Home Assistant.
+"""
+
+from datetime import date
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bucket name and the format of its period
+PERIODS: dict[str, str] = {
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m',
+}
+
+
+class UsageMeter:
+    """Accumulate counter growth into day and month buckets."""
+
+    def __init__(self, state: dict | None = None) -> None:
+        """Initialise, optionally with a persisted state."""
+        state = state or {}
+
+        # Last seen value per interface of every counter, values of states
+        # that only kept the sum of all interfaces start a new baseline
+        self.last: dict[str, dict[str, int]] = {
+            counter: dict(values)
+            for counter, values in state.get('last', {}).items()
+            if isinstance(values, dict)
+        }
+
+        # Period and usage per counter of every bucket
+        self.buckets: dict[str, dict] = {
+            bucket: dict(state.get(bucket, {})) for bucket in PERIODS
+        }
+
+    def record(self, counters: dict[str, dict[str, int | None] | None], today: date) -> bool:
+        """Add the growth of the counters to the buckets, return whether anything changed.
+
+        Counters map their value per interface name, or are None when the
+        poll did not return them. Interfaces that are no longer reported are
+        forgotten, so they start a new baseline when they return.
+        """
+        changed = self._roll(today)
+
+        for counter, values in counters.items():
+            if values is None:
+                continue
+
+            previous = self.last.get(counter, {})
+            last = {interface: previous[interface]
+                    for interface in values if interface in previous}
+            delta = 0
+
+            if last.keys() != previous.keys():
+                changed = True
+
+            for interface, value in values.items():
+                if value is None:
+                    continue
+
+                if interface not in last:
+                    # Nothing to compare with yet, this value is the baseline
+                    changed = True
+                elif value < last[interface]:
+                    # The counter was reset, for example by a router reboot,
+                    # so all traffic counted since then is new
+                    _LOGGER.debug("Counter %s of %s was reset (%d < %d)",
+                                  counter, interface, value, last[interface])
+                    delta += value
+                else:
+                    delta += value - last[interface]
+
+                last[interface] = value
+
+            self.last[counter] = last
+
+            if delta:
+                for usage in self.buckets.values():
+                    usage[counter] = usage.get(counter, 0) + delta
+
+                changed = True
+
+        return changed
+
+    def usage(self, bucket: str, counter: str) -> int | None:
+        """Return the usage of a counter in the current period of a bucket."""
+        if not self.buckets[bucket].get('period'):
+            return None
+
+        return self.buckets[bucket].get(counter, 0)
+
+    def as_dict(self) -> dict:
+        """Return the state to persist."""
+        return {'last': self.last, **self.buckets}
+
+    def _roll(self, today: date) -> bool:
+        """Start new buckets when their period has passed."""
+        changed = False
+
+        for bucket, period_format in PERIODS.items():
+            period = today.strftime(period_format)
+
+            if self.buckets[bucket].get('period') != period:
+                self.buckets[bucket] = {'period': period}
+                changed = True
+
+        return changed
@@ -0,0 +1,75 @@
+"""Tests of the poll deadline of the router API."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiohttp
+import pytest
+
+from custom_components.odido_klikklaar.api import (RouterAPI,
+                                                   RouterAPIAuthError,
+                                                   RouterAPIConnectionError)
+from tools.mock_router import LOGIN_LATENCY, MockRouter
+
+OIDS = ['status', 'lanhosts', 'Traffic_Status', 'cardpage_status']
+
+
+@asynccontextmanager
+async def _api(latency: dict[str, float] | None = None,
+               pwd: str = 'admin') -> AsyncIterator[RouterAPI]:
+    """Yield an API talking to a mock router with the given response times."""
+    router = MockRouter(latency=latency or 0)
+    port = await router.start()
+
+    try:
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            yield RouterAPI(host=f'127.0.0.1:{port}',
+                            user='admin',
+                            pwd=pwd,
+                            session=session,
+                            schema='http')
+    finally:
+        await router.stop()
+
+
+def test_slow_query_is_cut_off_at_the_deadline():
+    """The queries that completed are returned, the one still running is an error."""
+    async def _async_test():
+        async with _api({'Traffic_Status': 5}) as api:
+            result = await api.async_poll(OIDS, timeout=1)
+
+        assert set(result.data) == {'status', 'lanhosts', 'cardpage_status'}
+        assert list(result.errors) == ['Traffic_Status']
+        assert isinstance(result.errors['Traffic_Status'], RouterAPIConnectionError)
+        assert result.elapsed < 2
+
+    asyncio.run(_async_test())
+
+
+def test_slow_login_fails_the_poll():
+    """A login that runs past the deadline fails the poll at the deadline."""
+    async def _async_test():
+        async with _api({LOGIN_LATENCY: 5}) as api:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+
+            with pytest.raises(RouterAPIConnectionError):
+                await api.async_poll(OIDS, timeout=1)
+
+            assert loop.time() - start < 2
+
+    asyncio.run(_async_test())
+
+
+def test_wrong_password_is_rejected():
+    """The mock router refuses a login with the right user but a wrong password."""
+    async def _async_test():
+        async with _api(pwd='wrong') as api:
+            with pytest.raises(RouterAPIAuthError):
+                await api.async_login()
+
+        async with _api() as api:
+            assert await api.async_login()
+
+    asyncio.run(_async_test())
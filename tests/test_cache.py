@@ -0,0 +1,95 @@
+"""Tests of the query cache."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiohttp
+import pytest
+
+from custom_components.odido_klikklaar.api import RouterAPI, RouterAPIAuthError
+from custom_components.odido_klikklaar.cache import QueryCache
+from tools.mock_router import MockRouter
+
+
+@asynccontextmanager
+async def _cache() -> AsyncIterator[tuple[MockRouter, QueryCache]]:
+    """Yield a mock router and a cache in front of a logged in API for it."""
+    router = MockRouter(latency=0.1)
+    port = await router.start()
+
+    try:
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            api = RouterAPI(host=f'127.0.0.1:{port}',
+                            user='admin',
+                            pwd='admin',
+                            session=session,
+                            schema='http')
+            await api.async_login()
+            router.requests = 0
+
+            yield router, QueryCache(api)
+    finally:
+        await router.stop()
+
+
+def test_concurrent_queries_share_a_request():
+    """Concurrent queries of an oid are answered by one router request."""
+    async def _async_test():
+        async with _cache() as (router, cache):
+            results = await asyncio.gather(*(cache.async_query('status') for _ in range(10)))
+
+            assert router.requests == 1
+            assert all(result is results[0] for result in results)
+
+    asyncio.run(_async_test())
+
+
+def test_cached_object_is_reused():
+    """A cached object is returned without a request until it is too old."""
+    async def _async_test():
+        async with _cache() as (router, cache):
+            first = await cache.async_query('status')
+
+            assert await cache.async_query('status') is first
+            assert router.requests == 1
+
+            await asyncio.sleep(0.05)
+            await cache.async_query('status', max_age=0.01)
+            assert router.requests == 2
+
+    asyncio.run(_async_test())
+
+
+def test_objects_from_a_poll_are_cached():
+    """Objects stored from a poll are served without a request."""
+    async def _async_test():
+        async with _cache() as (router, cache):
+            cache.update({'status': {'polled': True}})
+
+            assert await cache.async_query('status') == {'polled': True}
+            assert router.requests == 0
+
+    asyncio.run(_async_test())
+
+
+def test_rejected_login_suspends_the_cache():
+    """Once a new login is rejected no more requests are sent."""
+    async def _async_test():
+        async with _cache() as (router, cache):
+            # Session expired and the password was changed on the router
+            router.sessions.clear()
+            router.pwd = 'changed'
+
+            with pytest.raises(RouterAPIAuthError):
+                await cache.async_query('status')
+
+            assert cache.suspended
+            requests = router.requests
+
+            with pytest.raises(RouterAPIAuthError):
+                await cache.async_query('lanhosts')
+
+            assert router.requests == requests
+
+    asyncio.run(_async_test())
@@ -0,0 +1,100 @@
+"""Tests of the interface lookup table."""
+
+from custom_components.odido_klikklaar.interfaces import (LEGACY_WAN,
+                                                          LEGACY_WAN_ADDRESS,
+                                                          InterfaceResolver,
+                                                          build_interface_index)
+from tools.mock_router import build_payloads
+
+
+def _strip(entries: list[dict], **values) -> list[dict]:
+    """Return the entries without names and types, plus the given values."""
+    return [{key: value for key, value in entry.items()
+             if not key.startswith('X_ZYXEL_') and key not in ('Name', 'Alias', 'Type')}
+            | values
+            for entry in entries]
+
+
+def test_described_lists():
+    """Described interfaces are found by their type and name."""
+    index = build_interface_index(build_payloads(ports=2))
+
+    assert index.wan == (1, 2)
+    assert index.wan_names == ('Internet', 'IMS')
+    assert index.lan_ports == {'LAN1': 0, 'LAN2': 1}
+    assert index.wan_address == 1
+
+
+def test_described_lists_in_another_order():
+    """The WAN interfaces are found wherever the firmware puts them."""
+    data = build_payloads(ports=2)
+    traffic = data['Traffic_Status']
+    traffic['ipIface'].reverse()
+    data['cardpage_status']['WanLanInfo'].reverse()
+
+    index = build_interface_index(data)
+
+    assert index.wan == (2, 3)
+    assert index.wan_names == ('IMS', 'Internet')
+    assert index.wan_address == 2
+
+
+def test_type_without_side_falls_back_to_the_name():
+    """A type key that does not tell WAN or LAN does not hide a WAN name."""
+    data = build_payloads(ports=0)
+    data['Traffic_Status']['ipIface'] = [
+        {'X_ZYXEL_SrvName': 'br0', 'X_ZYXEL_Type': 'IP_Routed'},
+        {'X_ZYXEL_SrvName': 'wwan0', 'X_ZYXEL_Type': 'IP_Routed'},
+        {'X_ZYXEL_SrvName': 'Guest', 'X_ZYXEL_Type': 'IP_Routed'},
+    ]
+
+    assert build_interface_index(data).wan == (1,)
+
+
+def test_undescribed_lists():
+    """Lists without names or types use the known layout."""
+    data = build_payloads(ports=2)
+    traffic = data['Traffic_Status']
+    traffic['ipIface'] = _strip(traffic['ipIface'])
+    traffic['ethIface'] = _strip(traffic['ethIface'])
+    data['cardpage_status']['WanLanInfo'] = _strip(data['cardpage_status']['WanLanInfo'])
+
+    index = build_interface_index(data)
+
+    assert index.wan == LEGACY_WAN
+    assert index.wan_names == ('ipIface1', 'ipIface2')
+    assert index.lan_ports == {'LAN1': 0, 'LAN2': 1}
+    assert index.wan_address == LEGACY_WAN_ADDRESS
+
+
+def test_unrecognised_lists():
+    """Described lists without a recognisable WAN use the known layout for both."""
+    data = build_payloads(ports=2)
+    traffic = data['Traffic_Status']
+    common = data['cardpage_status']
+    traffic['ipIface'] = _strip(traffic['ipIface'], X_ZYXEL_Type='IP_Routed', Name='Default')
+    common['WanLanInfo'] = _strip(common['WanLanInfo'], X_ZYXEL_Type='IP_Routed', Name='Default')
+
+    index = build_interface_index(data)
+
+    assert index.wan == LEGACY_WAN
+    assert index.wan_address == LEGACY_WAN_ADDRESS
+
+
+def test_wan_without_address():
+    """A recognised WAN interface without an address has no WAN address."""
+    data = build_payloads(ports=2)
+    del data['cardpage_status']['WanLanInfo'][1]['IPv4Address']
+
+    assert build_interface_index(data).wan_address is None
+
+
+def test_resolver_keeps_the_table():
+    """The table is kept for polls without the interface lists and rebuilt when they change."""
+    resolver = InterfaceResolver()
+    data = build_payloads(ports=2)
+    index = resolver.resolve(data)
+
+    assert resolver.resolve({'status': data['status']}) is index
+    assert resolver.resolve(build_payloads(ports=2)) is index
+    assert resolver.resolve(build_payloads(ports=3)).lan_ports == {'LAN1': 0, 'LAN2': 1, 'LAN3': 2}
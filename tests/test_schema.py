@@ -0,0 +1,48 @@
+"""Tests of the sensor schema validation."""
+
+from homeassistant.components.sensor import SensorDeviceClass
+import pytest
+
+from custom_components.odido_klikklaar.const import EP_TRAFFIC
+from custom_components.odido_klikklaar.schema import (DEVICE_CLASSES,
+                                                      SchemaError,
+                                                      SensorSpec,
+                                                      compile_sensor)
+
+
+@pytest.mark.parametrize('aggregate', [
+    'usage(week, downloaded)',
+    'usage(day, received)',
+    'usage(day)',
+    'wan_sum(NoSuchCounter)',
+    'wan_sum()',
+    'lan_counter(BytesSent, BytesReceived)',
+    'wan_address(BytesSent)',
+    'no_such_aggregate()',
+])
+def test_invalid_aggregate(aggregate):
+    """Unknown aggregates and arguments fail when the sensor is compiled."""
+    with pytest.raises(SchemaError):
+        compile_sensor(SensorSpec(key='test', oid=EP_TRAFFIC, aggregate=aggregate))
+
+
+@pytest.mark.parametrize('aggregate', [
+    'usage(month, uploaded)',
+    'wan_sum(BytesReceived)',
+    'lan_counter(BytesSent)',
+    'wan_address()',
+])
+def test_valid_aggregate(aggregate):
+    """Known aggregates with valid arguments compile."""
+    assert callable(compile_sensor(SensorSpec(key='test', oid=EP_TRAFFIC, aggregate=aggregate)))
+
+
+def test_invalid_device_class():
+    """An unknown device class fails when the sensor is compiled."""
+    with pytest.raises(SchemaError):
+        compile_sensor(SensorSpec(key='test', oid=EP_TRAFFIC, path='a', device_class='bogus'))
+
+
+def test_device_classes_are_known_to_home_assistant():
+    """Every accepted device class is one Home Assistant knows."""
+    assert set(DEVICE_CLASSES) <= {device_class.value for device_class in SensorDeviceClass}
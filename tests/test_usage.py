@@ -0,0 +1,139 @@
+"""Tests of the data usage meters."""
+
+from datetime import date
+
+from custom_components.odido_klikklaar.const import KEY_INTERFACES
+from custom_components.odido_klikklaar.extract import wan_counter, wan_counters
+from custom_components.odido_klikklaar.interfaces import build_interface_index
+from custom_components.odido_klikklaar.usage import UsageMeter
+from tools.mock_router import build_payloads
+
+TODAY = date(2025, 5, 30)
+
+
+def _record(meter: UsageMeter, values: dict[str, int | None], today: date = TODAY) -> bool:
+    """Record the downloaded counter of the given interfaces."""
+    return meter.record({'downloaded': values}, today)
+
+
+def test_first_values_are_the_baseline():
+    """The first values of a counter do not count as usage."""
+    meter = UsageMeter()
+
+    assert _record(meter, {'wwan0': 900_000_000_000, 'wwan1': 1_000})
+    assert meter.usage('day', 'downloaded') == 0
+    assert meter.usage('month', 'downloaded') == 0
+
+
+def test_growth_is_summed_over_interfaces():
+    """The growth of every interface is added to the buckets."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 1_000, 'wwan1': 100})
+
+    assert _record(meter, {'wwan0': 1_500, 'wwan1': 150})
+    assert meter.usage('day', 'downloaded') == 550
+    assert not _record(meter, {'wwan0': 1_500, 'wwan1': 150})
+
+
+def test_partial_reset():
+    """A reset of one interface only counts the traffic of that interface."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 900_000_000_000, 'wwan1': 1_000})
+    _record(meter, {'wwan0': 900_000_100_000, 'wwan1': 1_000})
+
+    _record(meter, {'wwan0': 900_000_100_000, 'wwan1': 10})
+
+    assert meter.usage('day', 'downloaded') == 100_010
+
+
+def test_full_reset():
+    """After a reboot all traffic counted since then is new."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 900_000_000_000, 'wwan1': 1_000})
+
+    _record(meter, {'wwan0': 5_000, 'wwan1': 20})
+
+    assert meter.usage('day', 'downloaded') == 5_020
+
+
+def test_changed_interfaces_start_a_new_baseline():
+    """An interface that joins or leaves the WAN set does not count its lifetime traffic."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 1_000})
+
+    _record(meter, {'wwan0': 1_100, 'wwan1': 900_000_000_000})
+    _record(meter, {'wwan1': 900_000_000_050})
+    _record(meter, {'wwan0': 1_200, 'wwan1': 900_000_000_060})
+
+    assert meter.usage('day', 'downloaded') == 160
+
+
+def test_missing_values_keep_the_baseline():
+    """Counters the poll did not return are not reset."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 1_000, 'wwan1': 100})
+
+    meter.record({'downloaded': None}, TODAY)
+    _record(meter, {'wwan0': None, 'wwan1': 200})
+    _record(meter, {'wwan0': 1_300, 'wwan1': 200})
+
+    assert meter.usage('day', 'downloaded') == 400
+
+
+def test_day_and_month_roll():
+    """A new day starts a new day bucket, a new month a new month bucket as well."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 0}, date(2025, 5, 30))
+    _record(meter, {'wwan0': 100}, date(2025, 5, 30))
+
+    assert _record(meter, {'wwan0': 150}, date(2025, 5, 31))
+    assert meter.usage('day', 'downloaded') == 50
+    assert meter.usage('month', 'downloaded') == 150
+
+    _record(meter, {'wwan0': 160}, date(2025, 6, 1))
+    assert meter.usage('day', 'downloaded') == 10
+    assert meter.usage('month', 'downloaded') == 10
+
+
+def test_persisted_state():
+    """A meter restored from its state continues where it left off."""
+    meter = UsageMeter()
+    _record(meter, {'wwan0': 1_000})
+    _record(meter, {'wwan0': 1_100})
+
+    restored = UsageMeter(meter.as_dict())
+    _record(restored, {'wwan0': 1_150})
+
+    assert restored.usage('day', 'downloaded') == 150
+
+
+def test_state_with_summed_counters():
+    """A state that kept the sum of all interfaces starts a new baseline."""
+    meter = UsageMeter({'last': {'downloaded': 900_000_001_000},
+                        'day': {'period': '2025-05-30', 'downloaded': 10}})
+
+    _record(meter, {'wwan0': 900_000_000_000, 'wwan1': 2_000})
+
+    assert meter.usage('day', 'downloaded') == 10
+
+
+def test_wan_interfaces_with_the_same_name():
+    """Interfaces sharing a name are metered apart and match the summed counter."""
+    data = build_payloads(ports=0)
+    data['Traffic_Status']['ipIface'][2]['X_ZYXEL_SrvName'] = 'Internet'
+    data['Traffic_Status']['ipIfaceSt'][1]['BytesReceived'] = 100
+    data['Traffic_Status']['ipIfaceSt'][2]['BytesReceived'] = 900
+    data[KEY_INTERFACES] = build_interface_index(data)
+
+    values = wan_counters(data, 'BytesReceived')
+
+    assert values == {'Internet': 100, 'Internet#2': 900}
+    assert sum(values.values()) == wan_counter(data, 'BytesReceived')
+
+    meter = UsageMeter()
+    _record(meter, values)
+    data['Traffic_Status']['ipIfaceSt'][1]['BytesReceived'] = 150
+    data['Traffic_Status']['ipIfaceSt'][2]['BytesReceived'] = 1_000
+    _record(meter, wan_counters(data, 'BytesReceived'))
+
+    assert meter.usage('day', 'downloaded') == 150
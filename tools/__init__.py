@@ -0,0 +1 @@
+"""Development tools for the Odido Klik&Klaar integration."""
@@ -0,0 +1,114 @@
+"""Measure the total poll time per concurrency limit and query order.
+
+Without --host the benchmark runs against a local mock router, otherwise
+against a real router. For example:
+
+    python -m tools.benchmark_poll --serialize
+    python -m tools.benchmark_poll --host 192.168.1.1 --password secret
+"""
+
+import argparse
+import asyncio
+import statistics
+
+import aiohttp
+
+from custom_components.odido_klikklaar.api import RouterAPI
+from custom_components.odido_klikklaar.const import (API_SCHEMA,
+                                                     DEFAULT_POLL_TIMEOUT,
+                                                     DEFAULT_USER,
+                                                     QUERY_ORDERS)
+from custom_components.odido_klikklaar.schema import POLL_ENDPOINTS
+
+from .mock_router import MockRouter
+
+ENDPOINTS = POLL_ENDPOINTS
+
+
+async def async_benchmark(api: RouterAPI,
+                          concurrency: int,
+                          order: str,
+                          rounds: int,
+                          timeout: float) -> dict:
+    """Poll the router repeatedly with one setting and summarise the timings."""
+    # A warm-up poll gives the planner response times to order by
+    api.latency.clear()
+    await api.async_poll(ENDPOINTS, timeout, concurrency, order)
+
+    elapsed = []
+    errors = 0
+
+    for _ in range(rounds):
+        result = await api.async_poll(ENDPOINTS, timeout, concurrency, order)
+        elapsed.append(result.elapsed)
+        errors += len(result.errors)
+
+    return {
+        'concurrency': concurrency,
+        'order': order,
+        'mean': statistics.mean(elapsed),
+        'median': statistics.median(elapsed),
+        'max': max(elapsed),
+        'errors': errors,
+    }
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run the benchmark for every combination of settings."""
+    router = None
+    host, schema = args.host, API_SCHEMA
+
+    if host is None:
+        router = MockRouter(serialize=args.serialize,
+                            max_parallel=args.max_parallel,
+                            user=args.user,
+                            pwd=args.password)
+        host, schema = f'127.0.0.1:{await router.start()}', 'http'
+
+    connector = aiohttp.TCPConnector(ssl=False)
+    jar = aiohttp.CookieJar(unsafe=True)
+
+    try:
+        async with aiohttp.ClientSession(connector=connector, cookie_jar=jar) as session:
+            api = RouterAPI(host=host,
+                            user=args.user,
+                            pwd=args.password,
+                            session=session,
+                            schema=schema)
+
+            print(f'{"concurrency":>11} {"order":<14} {"mean":>7} {"median":>7} {"max":>7} {"errors":>6}')
+
+            for concurrency in args.concurrency:
+                for order in args.orders:
+                    row = await async_benchmark(api, concurrency, order,
+                                                args.rounds, args.timeout)
+                    print(f'{row["concurrency"]:>11} {row["order"]:<14} '
+                          f'{row["mean"]:>7.3f} {row["median"]:>7.3f} '
+                          f'{row["max"]:>7.3f} {row["errors"]:>6}')
+    finally:
+        if router is not None:
+            await router.stop()
+
+
+def main() -> None:
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=None,
+                        help='router to benchmark instead of the mock router')
+    parser.add_argument('--user', default=DEFAULT_USER)
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_POLL_TIMEOUT)
+    parser.add_argument('--concurrency', type=lambda v: [int(c) for c in v.split(',')],
+                        default=list(range(1, len(ENDPOINTS) + 1)))
+    parser.add_argument('--orders', type=lambda v: v.split(','), default=QUERY_ORDERS)
+    parser.add_argument('--serialize', action='store_true',
+                        help='let the mock router handle one DAL request at a time')
+    parser.add_argument('--max-parallel', type=int, default=None,
+                        help='let the mock router fail requests above this concurrency')
+
+    asyncio.run(_async_main(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
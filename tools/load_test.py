@@ -0,0 +1,351 @@
+"""Measure how the coordinators scale with the number of routers.
+
+Boots Home Assistant from a fresh configuration directory that holds this
+integration, adds a fleet of local mock routers through the config flow,
+lets them poll for a fixed duration, and reports event loop lag, memory
+per router, open sockets and poll schedule drift per fleet size. For
+example:
+
+    python -m tools.load_test --routers 1 10 50 100 --duration 300
+
+Every fleet size runs in a fresh process, so memory measurements do not
+carry over, and the mock routers are served over HTTPS from another
+process, so they do not add to the measured event loop lag. The mock
+routers bind to their own loopback address (127.0.x.y), because cookies
+are shared by all ports of a host; this needs Linux. Needs Home Assistant
+and its frontend package, without it Home Assistant starts in recovery
+mode and does not set up any integration.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from functools import partial
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import resource
+import socket
+import ssl
+import tempfile
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from homeassistant import bootstrap
+from homeassistant.config_entries import SOURCE_USER, ConfigEntryState
+from homeassistant.const import (CONF_HOST,
+                                 CONF_PASSWORD,
+                                 CONF_SCAN_INTERVAL,
+                                 CONF_USERNAME)
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.runner import RuntimeConfig
+
+from custom_components.odido_klikklaar.const import CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT, DOMAIN
+from custom_components.odido_klikklaar.coordinator import RouterCoordinator
+
+from .mock_router import MockRouter
+
+# Interval of the event loop lag probe, and how often it counts sockets
+LAG_INTERVAL = 0.05
+SOCKET_SAMPLE_EVERY = 20
+
+
+def _loopback_address(index: int) -> str:
+    """Return the loopback address of the n-th mock router."""
+    return f'127.0.{index // 254}.{index % 254 + 1}'
+
+
+def _rss_kib() -> float:
+    """Return the resident memory of this process in KiB."""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024
+    except OSError:
+        # Only the peak is available elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _open_sockets() -> int | None:
+    """Return the number of open sockets of this process."""
+    try:
+        fds = os.listdir('/proc/self/fd')
+    except OSError:
+        return None
+
+    sockets = 0
+
+    for fd in fds:
+        try:
+            sockets += os.readlink(f'/proc/self/fd/{fd}').startswith('socket:')
+        except OSError:
+            continue
+
+    return sockets
+
+
+def _free_port() -> int:
+    """Return a free TCP port on the loopback interface."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _ssl_context(directory: str) -> ssl.SSLContext:
+    """Return a server context with a throwaway self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'mock-router')])
+    now = datetime.now(timezone.utc)
+    certificate = (x509.CertificateBuilder()
+                   .subject_name(name)
+                   .issuer_name(name)
+                   .public_key(key.public_key())
+                   .serial_number(x509.random_serial_number())
+                   .not_valid_before(now)
+                   .not_valid_after(now + timedelta(days=1))
+                   .sign(key, hashes.SHA256()))
+
+    path = Path(directory, 'router.pem')
+    path.write_bytes(key.private_bytes(serialization.Encoding.PEM,
+                                       serialization.PrivateFormat.PKCS8,
+                                       serialization.NoEncryption())
+                     + certificate.public_bytes(serialization.Encoding.PEM))
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(path)
+
+    return context
+
+
+def _percentile(values: list[float], percent: float) -> float | None:
+    """Return a percentile of the values."""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+async def _async_serve_routers(conn, count: int, latency: float | None, ports: int) -> None:
+    """Serve mock routers until the parent asks for their statistics."""
+    routers = [MockRouter(latency=latency, ports=ports) for _ in range(count)]
+    hosts = []
+
+    # The integration talks HTTPS to routers, like to the real ones
+    with tempfile.TemporaryDirectory() as directory:
+        context = _ssl_context(directory)
+
+    for index, router in enumerate(routers):
+        address = _loopback_address(index)
+        hosts.append(f'{address}:{await router.start(address, ssl_context=context)}')
+
+    conn.send(hosts)
+    await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+
+    conn.send({'requests': sum(router.requests for router in routers),
+               'rejected': sum(router.failures for router in routers)})
+
+    for router in routers:
+        await router.stop()
+
+
+def _serve_routers(conn, count: int, latency: float | None, ports: int) -> None:
+    """Process target serving the mock routers."""
+    asyncio.run(_async_serve_routers(conn, count, latency, ports))
+
+
+async def _async_monitor(lag: list[float], sockets: list[int]) -> None:
+    """Sample the event loop lag and the number of open sockets."""
+    loop = asyncio.get_running_loop()
+
+    for tick in itertools.count():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag.append(loop.time() - start - LAG_INTERVAL)
+
+        if tick % SOCKET_SAMPLE_EVERY == 0 and (count := _open_sockets()) is not None:
+            sockets.append(count)
+
+
+def _record_update(coordinator: RouterCoordinator, updates: list[tuple[float, bool]]) -> None:
+    """Remember when a refresh of a coordinator finished and whether it succeeded."""
+    updates.append((coordinator.hass.loop.time(), coordinator.last_update_success))
+
+
+async def _async_add_router(hass: HomeAssistant, host: str, options: dict) -> None:
+    """Add a router through the config flow, as a user does, and set its options."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={'source': SOURCE_USER},
+        data={CONF_HOST: host, CONF_USERNAME: 'admin', CONF_PASSWORD: 'admin'})
+
+    if result['type'] is not FlowResultType.CREATE_ENTRY:
+        raise RuntimeError(f'Unable to add the router at {host}: {result}')
+
+    # Reloads the entry, see the update listener in __init__.py
+    hass.config_entries.async_update_entry(result['result'], options=options)
+
+
+async def _async_run_fleet(hosts: list[str],
+                           duration: float,
+                           scan_interval: int,
+                           poll_timeout: int) -> dict:
+    """Run Home Assistant with an entry per router for the duration and measure the process."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        # A configuration directory holding this integration as a custom one
+        os.symlink(Path(__file__).resolve().parents[1] / 'custom_components',
+                   Path(config_dir, 'custom_components'))
+        Path(config_dir, 'configuration.yaml').write_text(
+            f'http:\n  server_host: 127.0.0.1\n  server_port: {_free_port()}\n',
+            encoding='utf-8')
+
+        hass = await bootstrap.async_setup_hass(RuntimeConfig(config_dir=config_dir,
+                                                              skip_pip=True))
+
+        if hass is None:
+            raise RuntimeError('Home Assistant did not start')
+
+        await hass.async_start()
+        logging.getLogger().setLevel(logging.ERROR)
+
+        rss = _rss_kib()
+        lag: list[float] = []
+        sockets: list[int] = []
+        monitor = asyncio.create_task(_async_monitor(lag, sockets))
+
+        # All routers are added at once and then reload with the options
+        # at once, like they all refresh when Home Assistant starts
+        await asyncio.gather(*(
+            _async_add_router(hass, host, {CONF_SCAN_INTERVAL: scan_interval,
+                                           CONF_POLL_TIMEOUT: poll_timeout})
+            for host in hosts))
+        await hass.async_block_till_done()
+
+        coordinators: list[RouterCoordinator] = [
+            entry.runtime_data.coordinator
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+        ]
+        updates: list[list[tuple[float, bool]]] = [[] for _ in coordinators]
+
+        for coordinator, history in zip(coordinators, updates):
+            coordinator.async_add_listener(partial(_record_update, coordinator, history))
+
+        await asyncio.sleep(duration)
+
+        memory = (_rss_kib() - rss) / len(hosts)
+        monitor.cancel()
+
+        await hass.async_stop()
+
+    lag_ms = [value * 1000 for value in lag]
+
+    # Time between two refreshes beyond the scan interval
+    drift = [later[0] - earlier[0] - scan_interval
+             for history in updates
+             for earlier, later in zip(history, history[1:])]
+
+    return {
+        'routers': len(hosts),
+        'loaded': len(coordinators),
+        'polls': sum(len(history) for history in updates),
+        'failed': sum(not success for history in updates for _, success in history),
+        'lag_p50_ms': _percentile(lag_ms, 50),
+        'lag_p95_ms': _percentile(lag_ms, 95),
+        'lag_p99_ms': _percentile(lag_ms, 99),
+        'lag_max_ms': max(lag_ms, default=None),
+        'kib_per_router': memory,
+        'sockets': max(sockets, default=None),
+        'drift_p50_s': _percentile(drift, 50),
+        'drift_p95_s': _percentile(drift, 95),
+        'drift_max_s': max(drift, default=None),
+    }
+
+
+def _run_fleet(*args) -> dict:
+    """Process target running the coordinators."""
+    return asyncio.run(_async_run_fleet(*args))
+
+
+# Result key, column header and decimals of every column of the table
+COLUMNS: list[tuple[str, str, int]] = [
+    ('routers', 'routers', 0),
+    ('loaded', 'loaded', 0),
+    ('polls', 'polls', 0),
+    ('failed', 'failed', 0),
+    ('rejected', 'rejected', 0),
+    ('lag_p50_ms', 'lag p50', 1),
+    ('lag_p95_ms', 'lag p95', 1),
+    ('lag_p99_ms', 'lag p99', 1),
+    ('lag_max_ms', 'lag max', 1),
+    ('kib_per_router', 'KiB/rtr', 0),
+    ('sockets', 'sockets', 0),
+    ('drift_p50_s', 'drift p50', 2),
+    ('drift_p95_s', 'drift p95', 2),
+    ('drift_max_s', 'drift max', 2),
+]
+
+
+def _format_row(row: dict) -> str:
+    """Format the results of a fleet size as a table row."""
+    return ' '.join(f'{"-":>{len(header)}}' if row.get(key) is None
+                    else f'{row[key]:>{len(header)}.{decimals}f}'
+                    for key, header, decimals in COLUMNS)
+
+
+def main() -> None:
+    """Parse the command line and run the load test for every fleet size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--routers', type=int, nargs='+', default=[1, 10, 50, 100],
+                        help='fleet sizes to measure')
+    parser.add_argument('--duration', type=float, default=120,
+                        help='seconds to run every fleet size')
+    parser.add_argument('--scan-interval', type=int, default=30)
+    parser.add_argument('--poll-timeout', type=int, default=DEFAULT_POLL_TIMEOUT)
+    parser.add_argument('--latency', type=float, default=None,
+                        help='response time of every endpoint in seconds')
+    parser.add_argument('--ports', type=int, default=2,
+                        help='LAN ports of every mock router')
+    parser.add_argument('--json', default=None,
+                        help='also write the results to this file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    context = multiprocessing.get_context('spawn')
+    rows = []
+
+    print(' '.join(header for _, header, _ in COLUMNS))
+
+    for count in args.routers:
+        parent, child = context.Pipe()
+        server = context.Process(target=_serve_routers,
+                                 args=(child, count, args.latency, args.ports),
+                                 daemon=True)
+        server.start()
+        hosts = parent.recv()
+
+        with context.Pool(1) as pool:
+            row = pool.apply(_run_fleet, (hosts, args.duration,
+                                          args.scan_interval, args.poll_timeout))
+
+        parent.send(None)
+        row |= parent.recv()
+        server.join()
+
+        rows.append(row)
+        print(_format_row(row), flush=True)
+
+    if args.json is not None:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
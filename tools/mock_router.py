@@ -0,0 +1,326 @@
+"""Local stand-in for the DAL API of the Odido Klik&Klaar 5G router.
+
+Serves synthetic payloads for the endpoints the integration polls, with a
+configurable response time per endpoint. The router's habit of handling one
+DAL request at a time and failing under load can be emulated as well.
+
+Run standalone with:
+
+    python -m tools.mock_router --port 8080 --serialize
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+from collections.abc import Iterator
+from contextlib import contextmanager
+import itertools
+import multiprocessing
+import secrets
+import ssl
+import time
+
+from aiohttp import web
+
+# Response time per endpoint in seconds, roughly as observed on real units.
+# The login takes the time under LOGIN_LATENCY, which is not delayed by default
+LOGIN_LATENCY = 'UserLogin'
+DEFAULT_LATENCY: dict[str, float] = {
+    'status': 0.3,
+    'lanhosts': 0.8,
+    'Traffic_Status': 0.4,
+    'cardpage_status': 0.6,
+}
+
+SESSION_COOKIE = 'Session'
+
+
+# Hosts in the lanhosts object, which the integration does not poll
+LAN_HOSTS = 20
+
+
+def build_payloads(ports: int = 2, start: float | None = None) -> dict[str, dict]:
+    """Build synthetic payloads shaped like the router's DAL objects.
+
+    Besides the LAN ports, every port adds a LAN side IP interface, so the
+    interface lists grow with it.
+    """
+    payloads = {
+        'status': {
+            'CellIntfInfo': {
+                'RSSI': -61,
+                'X_ZYXEL_RSRQ': -11,
+                'X_ZYXEL_RSRP': -91,
+                'X_ZYXEL_SINR': 14,
+                'CurrentAccessTechnology': '5G-NSA',
+                'X_ZYXEL_CurrentBand': 'n78',
+            },
+        },
+        'lanhosts': {
+            'lanhosts': [
+                {
+                    'HostName': f'host-{i}',
+                    'IPAddress': f'192.168.1.{2 + i}',
+                    'PhysAddress': f'02:00:00:00:00:{i:02x}',
+                    'Active': i % 3 != 0,
+                    'X_ZYXEL_ConnectionType': 'Wi-Fi' if i % 2 else 'Ethernet',
+                }
+                for i in range(LAN_HOSTS)
+            ],
+        },
+        'Traffic_Status': {
+            'ipIface': [
+                {'X_ZYXEL_IfName': 'br0', 'X_ZYXEL_SrvName': 'LAN', 'X_ZYXEL_Type': 'LAN'},
+                {'X_ZYXEL_IfName': 'wwan0', 'X_ZYXEL_SrvName': 'Internet', 'X_ZYXEL_Type': 'WAN'},
+                {'X_ZYXEL_IfName': 'wwan1', 'X_ZYXEL_SrvName': 'IMS', 'X_ZYXEL_Type': 'WAN'},
+                *({'X_ZYXEL_IfName': f'br{i}', 'X_ZYXEL_SrvName': f'Guest{i}', 'X_ZYXEL_Type': 'LAN'}
+                  for i in range(1, ports + 1)),
+            ],
+            'ipIfaceSt': [{'BytesSent': 0, 'BytesReceived': 0} for _ in range(ports + 3)],
+            'ethIface': [
+                {'Name': f'eth{i}', 'X_ZYXEL_LanPort': f'LAN{i + 1}'} for i in range(ports)
+            ],
+            'ethIfaceSt': [{'BytesSent': 0, 'BytesReceived': 0} for _ in range(ports)],
+        },
+        'cardpage_status': {
+            'DeviceInfo': {
+                'ModelName': 'NR7101',
+                'Manufacturer': 'Zyxel',
+                'Description': 'Odido Klik&Klaar',
+                'SoftwareVersion': 'V1.00(ABUV.6)C0',
+                'HardwareVersion': '1.00',
+                'ProductClass': 'NR7101',
+                'SerialNumber': 'S000000000000',
+            },
+            'WanLanInfo': [
+                {'Name': 'LAN', 'X_ZYXEL_IfName': 'br0', 'X_ZYXEL_Type': 'LAN',
+                 'IPv4Address': [{'IPAddress': '192.168.1.1'}]},
+                {'Name': 'Internet', 'X_ZYXEL_IfName': 'wwan0', 'X_ZYXEL_Type': 'WAN',
+                 'IPv4Address': [{'IPAddress': '100.64.0.1'}]},
+                *({'Name': f'Guest{i}', 'X_ZYXEL_IfName': f'br{i}', 'X_ZYXEL_Type': 'LAN',
+                   'IPv4Address': [{'IPAddress': f'192.168.{1 + i}.1'}]}
+                  for i in range(1, ports + 1)),
+            ],
+        },
+    }
+
+    advance_counters(payloads, start)
+
+    return payloads
+
+
+def advance_counters(payloads: dict[str, dict], start: float | None = None) -> None:
+    """Set the byte counters of the payloads for the time since start, in place."""
+    uptime = time.monotonic() - (start or time.monotonic())
+    wan_bytes = int(1_000_000_000 + uptime * 250_000)
+    traffic = payloads['Traffic_Status']
+
+    for position, stats in enumerate(traffic['ipIfaceSt']):
+        if position == 0:
+            stats.update(BytesSent=wan_bytes // 2, BytesReceived=wan_bytes // 3)
+        elif position == 1:
+            stats.update(BytesSent=wan_bytes // 10, BytesReceived=wan_bytes)
+        elif position == 2:
+            stats.update(BytesSent=1_000, BytesReceived=2_000)
+        else:
+            stats.update(BytesSent=wan_bytes // (4 * position),
+                         BytesReceived=wan_bytes // (40 * position))
+
+    for position, stats in enumerate(traffic['ethIfaceSt'], 1):
+        stats.update(BytesSent=wan_bytes // (2 * position),
+                     BytesReceived=wan_bytes // (20 * position))
+
+
+class MockRouter:
+    """aiohttp application emulating the router's login and DAL endpoints."""
+
+    def __init__(self,
+                 latency: dict[str, float] | float | None = None,
+                 ports: int = 2,
+                 serialize: bool = False,
+                 max_parallel: int | None = None,
+                 user: str = 'admin',
+                 pwd: str = 'admin') -> None:
+        """Initialise."""
+        if latency is None:
+            latency = DEFAULT_LATENCY
+        elif not isinstance(latency, dict):
+            latency = dict.fromkeys(DEFAULT_LATENCY, latency)
+
+        self.latency = latency
+        self.serialize = serialize
+        self.max_parallel = max_parallel
+        self.user = user
+        self.pwd = pwd
+
+        self.sessions: set[str] = set()
+        self.started = time.monotonic()
+        # Built once, only the counters change between requests
+        self.payloads = build_payloads(ports, self.started)
+        self.requests = 0
+        self.failures = 0
+        self.active = 0
+        self.peak_active = 0
+
+        self._lock = asyncio.Lock()
+        self._runner: web.AppRunner | None = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/UserLogin', self._handle_login)
+        self.app.router.add_get('/cgi-bin/DAL', self._handle_dal)
+
+    async def start(self,
+                    host: str = '127.0.0.1',
+                    port: int = 0,
+                    ssl_context: ssl.SSLContext | None = None) -> int:
+        """Start serving and return the bound port, over HTTPS when given a context."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port, ssl_context=ssl_context)
+        await site.start()
+
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        """Validate the credentials and hand out a session cookie."""
+        self.requests += 1
+        payload = await request.json()
+        await asyncio.sleep(self.latency.get(LOGIN_LATENCY, 0))
+
+        try:
+            pwd = base64.b64decode(payload.get('Input_Passwd', ''), validate=True).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError):
+            pwd = None
+
+        if payload.get('Input_Account') != self.user or pwd != self.pwd:
+            return web.json_response({'result': 'ZCFG_ERROR_PASSWORD'})
+
+        token = secrets.token_hex(8)
+        self.sessions.add(token)
+
+        response = web.json_response({'result': 'ZCFG_SUCCESS'})
+        response.set_cookie(SESSION_COOKIE, token)
+
+        return response
+
+    async def _handle_dal(self, request: web.Request) -> web.Response:
+        """Answer a DAL query after the endpoint's response time."""
+        self.requests += 1
+
+        if request.cookies.get(SESSION_COOKIE) not in self.sessions:
+            # Refused with a ZCFG result, which discovery fingerprints
+            return web.json_response({'result': 'ZCFG_ERROR_AUTH'}, status=401)
+
+        oid = request.query.get('oid')
+
+        if oid not in self.payloads:
+            return web.json_response({'result': 'ZCFG_NO_SUCH_OBJECT'})
+
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+        try:
+            if self.max_parallel is not None and self.active > self.max_parallel:
+                self.failures += 1
+                return web.Response(status=503)
+
+            if self.serialize:
+                async with self._lock:
+                    await asyncio.sleep(self.latency.get(oid, 0))
+            else:
+                await asyncio.sleep(self.latency.get(oid, 0))
+        finally:
+            self.active -= 1
+
+        if oid == 'Traffic_Status':
+            advance_counters(self.payloads, self.started)
+
+        return web.json_response({'result': 'ZCFG_SUCCESS', 'Object': [self.payloads[oid]]})
+
+
+async def _async_serve_until_closed(conn, kwargs: dict) -> None:
+    """Serve a mock router until the parent closes the connection."""
+    router = MockRouter(**kwargs)
+    conn.send(await router.start())
+    await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+    await router.stop()
+
+
+def _serve_until_closed(conn, kwargs: dict) -> None:
+    """Process target serving a mock router."""
+    asyncio.run(_async_serve_until_closed(conn, kwargs))
+
+
+@contextmanager
+def serve_in_process(**kwargs) -> Iterator[int]:
+    """Serve a mock router from another process and yield its port.
+
+    Keeps the work of the router out of the timings, event loop and
+    tracemalloc measurements of the caller.
+    """
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe()
+    process = context.Process(target=_serve_until_closed, args=(child, kwargs), daemon=True)
+    process.start()
+
+    try:
+        yield parent.recv()
+    finally:
+        parent.send(None)
+        process.join()
+
+
+async def _async_serve(args: argparse.Namespace) -> None:
+    """Serve mock routers until interrupted."""
+    routers = []
+
+    for port in itertools.islice(itertools.count(args.port), args.count):
+        router = MockRouter(latency=args.latency,
+                            ports=args.ports,
+                            serialize=args.serialize,
+                            max_parallel=args.max_parallel,
+                            user=args.user,
+                            pwd=args.password)
+        print(f'Mock router listening on http://{args.bind}:{await router.start(args.bind, port)}')
+        routers.append(router)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for router in routers:
+            await router.stop()
+
+
+def main() -> None:
+    """Parse the command line and serve."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--count', type=int, default=1,
+                        help='number of routers, on consecutive ports')
+    parser.add_argument('--latency', type=float, default=None,
+                        help='response time of every endpoint in seconds')
+    parser.add_argument('--ports', type=int, default=2,
+                        help='number of LAN ports, the interface lists grow with it')
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--serialize', action='store_true',
+                        help='handle one DAL request at a time')
+    parser.add_argument('--max-parallel', type=int, default=None,
+                        help='fail DAL requests above this concurrency')
+
+    try:
+        asyncio.run(_async_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()